@@ -0,0 +1,36 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Barrido Gauss-Seidel de la evaluación de políticas, compilado con Cython.
+
+Alternativa AOT al kernel `_sweep` de `policy_evaluation.py` cuando numba
+no está disponible. Compilar una vez desde DP/Algorithms/ con:
+
+    cythonize -i _sweep_cy.pyx
+"""
+
+from libc.math cimport fabs
+from libc.stdint cimport int32_t, int64_t
+
+ctypedef fused index_t:       # next_idx puede venir en int32 (TabularModel) o int64
+    int32_t
+    int64_t
+
+
+def sweep(double[::1] V, const index_t[::1] next_idx, const double[::1] reward,
+          const int64_t[::1] non_term, double gamma):
+    """
+    Un barrido in-place de V(s) ← r + γ·V(s') sobre `non_term`. Devuelve Δ.
+    """
+    cdef double delta = 0.0, v, nv, d
+    cdef Py_ssize_t k, i, n = non_term.shape[0]
+
+    for k in range(n):
+        i  = non_term[k]
+        v  = V[i]
+        nv = reward[i] + gamma * V[next_idx[i]]
+        V[i] = nv
+        d = fabs(v - nv)
+        if d > delta:
+            delta = d
+
+    return delta
@@ -26,8 +26,18 @@ hasta que Δ < θ
 return V
 """
 
+from concurrent.futures import ThreadPoolExecutor
 
-def policy_evaluation(env, policy, gamma: float = 1.0, theta: float = 1e-6, report: bool = False):
+import numpy as np
+
+try:                      # numba es opcional: compila el barrido a código nativo
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def policy_evaluation(env, policy, gamma: float = 1.0, theta: float = 1e-6, report: bool = False,
+                      method: str = "iterative", acyclic: bool = True, n_workers: int = 1):
     """
     ============================================================================
     Evaluación de una política  (determinista, entorno determinista)
@@ -41,6 +51,15 @@ def policy_evaluation(env, policy, gamma: float = 1.0, theta: float = 1e-6, repo
       • gamma    : factor de descuento γ ∈ (0,1]
       • theta    : umbral de convergencia
       • report   : si es True, muestra trazas de cada iteración
+      • method   : "iterative" → barridos de Bellman hasta Δ < θ (por defecto)
+                   "linear"    → solución exacta de (I − γP_π)V = r_π con un
+                                 solver disperso (requiere scipy; ignora θ)
+      • acyclic  : si es True y cada s' tiene índice mayor que s (horizonte
+                   finito: la etapa siempre avanza), "iterative" se resuelve
+                   con una única pasada hacia atrás, exacta. Si el orden no
+                   lo permite, o con False, se usan los barridos de Bellman
+      • n_workers: hilos para los barridos iterativos (Jacobi por bloques de
+                   estados); solo se usan con |S| ≥ 10 000
 
     Salida
       • policy   : se devuelve la misma política recibida (conveniencia)
@@ -57,53 +76,292 @@ def policy_evaluation(env, policy, gamma: float = 1.0, theta: float = 1e-6, repo
       para políticas fijas:
             v(s) ← r + γ·v(s')
       en entornos deterministas.
+
+    * Internamente V es un `np.ndarray` indexado por el entero de cada estado
+      y la transición de la política se simula una sola vez (next_idx, reward);
+      cada barrido solo lee arreglos contiguos.
+
+    * Con `method="linear"` se aprovecha que, para una política determinista,
+      P_π tiene un único 1 por fila: v_π es la solución exacta del sistema
+      disperso (I − γP_π)V = r_π. Evita las O(log(1/θ)/(1−γ)) iteraciones
+      cuando γ → 1. Los terminales (fila nula en P_π) quedan con V = 0.
+
+    * En horizonte finito (Inventario, Mochila) el grafo de la política es
+      acíclico y `state_space()` está ordenado por etapa: recorriendo los
+      estados de atrás hacia adelante, V(s') ya es definitivo al calcular
+      V(s) = r + γ·V(s'), así que basta una pasada O(|S|) (ver `acyclic`).
     """
 
     # -------------------------------------------------------------------------
-    # 1. INICIALIZACIÓN: V(s) ← 0 para todos los estados
+    # 1. INDEXACIÓN: cada estado recibe un entero i ∈ {0 … |S|-1}
     # -------------------------------------------------------------------------
-    V   = {s: 0.0 for s in env.state_space()}   # función valor inicial
-    cnt = 1                                     # contador de iteraciones (solo para trazas)
+    states   = tuple(env.state_space())                  # se enumera una sola vez
+    index    = {s: i for i, s in enumerate(states)}
+    n        = len(states)
+    mask     = getattr(env, "terminal_mask", None)          # precalculada, si existe
+    non_term = (np.flatnonzero(~mask).tolist() if mask is not None else
+                [i for i, s in enumerate(states) if not env.is_terminal(s)])
+    sim      = env.sim_step                              # evita el lookup por llamada
 
     # -------------------------------------------------------------------------
-    # 2. ITERACIÓN PRINCIPAL: aplicar Bellman hasta convergencia (|Δ| < θ)
+    # 2. PRE-CÓMPUTO: transición y recompensa de la política (entorno determinista)
+    #    next_idx[i] = índice de s' = sim_step(s, π(s)),  reward[i] = r
+    #    Los terminales apuntan a sí mismos con r = 0, así V(s) se queda en 0.
     # -------------------------------------------------------------------------
-    while True:
+    next_idx = np.arange(n, dtype=np.int32)
+    reward   = np.zeros(n)
+    for i in non_term:
+        s = states[i]
+        next_s, r = sim(s, policy[s])
+        next_idx[i] = index[next_s]
+        reward[i]   = r
 
-        if report:
-            print(f"\nIteración {cnt}")
+    V = evaluate_arrays(next_idx, reward, non_term, gamma, theta, method=method,
+                        acyclic=acyclic, n_workers=n_workers, report=report, states=states,
+                        labels={i: policy[states[i]] for i in non_term} if report else None)
 
-        delta = 0.0  # Δ ← 0
+    # -------------------------------------------------------------------------
+    # 3. SALIDA: devolver V como dict[State, float]
+    # -------------------------------------------------------------------------
+    return dict(zip(states, V.tolist()))
 
-        # ── 2.a Recorremos todos los estados del entorno
-        for s in env.state_space():
 
-            if env.is_terminal(s):        # omitimos estados terminales
-                continue
+def evaluate_arrays(next_idx, reward, non_term, gamma: float = 1.0, theta: float = 1e-6, *,
+                    method: str = "iterative", acyclic: bool = True, n_workers: int = 1,
+                    report: bool = False, states=None, labels=None):
+    """
+    ============================================================================
+    Núcleo de la evaluación de políticas sobre arreglos (sin entorno)
+    ─────────────────────────────────────────────────────────────────────────────
+    Entradas
+      • next_idx : np.ndarray[int]   — índice de s' = sim_step(s, π(s)) por estado
+      • reward   : np.ndarray[float] — recompensa r(s, π(s)) por estado
+      • non_term : índices de los estados no terminales (los demás quedan en 0)
+      • gamma    : factor de descuento γ ∈ (0,1]
+      • theta    : umbral de convergencia
+      • method   : "iterative" (barridos de Bellman) o "linear" (sistema disperso)
+      • acyclic  : con "iterative" y sin trazas, intenta primero la pasada
+                   exacta hacia atrás (`_solve_backward`)
+      • n_workers: si es > 1 y hay al menos `_MIN_PARALLEL_STATES` estados no
+                   terminales, reparte cada barrido de Jacobi entre hilos
+      • report   : si es True, muestra trazas de cada iteración; requiere
+                   `states` (estado por índice) y `labels` (acción por índice)
 
-            v = V[s]                      # valor anterior
-            a = policy[s]                 # acción según política π
-            next_s, r = env.sim_step(s, a)   # transición determinista: s ─a→ s'
+    Salida
+      • V        : np.ndarray[float] — v_π indexado por el entero del estado
+    ============================================================================
 
-            # ── 2.b Actualizar valor de estado: Bellman para políticas fijas
-            new_v = r + gamma * V[next_s]
-            V[s]  = new_v
+    Es la parte de `policy_evaluation` que no depende del entorno; la usa
+    también `policy_iteration`, que ya tiene las transiciones en tablas.
+    """
+    if method == "linear":
+        return _solve_linear(next_idx, reward, non_term, gamma)
+    if method != "iterative":
+        raise ValueError(f"Método desconocido {method!r}: use 'iterative' o 'linear'.")
 
-            # ── 2.c Actualizar máximo cambio observado
-            delta = max(delta, abs(v - new_v))
+    if acyclic and not report:
+        V = _solve_backward(next_idx, reward, non_term, gamma)
+        if V is not None:
+            return V
 
-            # ── 2.d (Opcional) Mostrar trazas si hubo cambio
-            if report and v != new_v:
-                print(f"  s:{s} ─a:{a}→ s':{next_s} | "
-                      f"r={r:+.3f}, γV(s')={gamma*V[next_s]:+.3f} → V(s)={new_v:+.3f}")
+    V   = np.zeros(len(next_idx))   # V(s) ← 0, indexado por el entero del estado
+    cnt = 1                         # contador de iteraciones (solo para trazas)
 
-        # ── 2.e Criterio de parada: convergencia si Δ < θ
-        if delta < theta:
-            break
+    # -------------------------------------------------------------------------
+    # ITERACIÓN SIN TRAZAS
+    #   ▸ con kernel compilado (numba / Cython): barridos Gauss-Seidel en `_sweep`
+    #   ▸ solo NumPy: barridos de Jacobi vectorizados
+    #         V_nuevo = r + γ·V[s'] ;  Δ = max |V_nuevo − V|
+    # -------------------------------------------------------------------------
+    if not report:
+        non_term = np.asarray(non_term, dtype=np.int64)
 
-        cnt += 1
+        if n_workers > 1 and len(non_term) >= _MIN_PARALLEL_STATES:
+            return _jacobi_threaded(V, next_idx, reward, non_term, gamma, theta, n_workers)
+
+        if _NATIVE_SWEEP:
+            while _sweep(V, next_idx, reward, non_term, gamma) >= theta:
+                pass
+            return V
+
+        r_nt, next_nt = reward[non_term], next_idx[non_term]
+        while True:
+            V_new = r_nt + gamma * V[next_nt]
+            delta = np.abs(V_new - V[non_term]).max(initial=0.0)
+            V[non_term] = V_new
+            if delta < theta:
+                return V
 
     # -------------------------------------------------------------------------
-    # 3. SALIDA: devolver V (y re-exponer la política para conveniencia)
+    # ITERACIÓN CON TRAZAS: mismo barrido, imprimiendo cada cambio de V(s)
     # -------------------------------------------------------------------------
+    while True:
+        print(f"\nIteración {cnt}")
+        if _sweep_report(V, next_idx, reward, non_term, gamma, states, labels) < theta:
+            return V
+        cnt += 1
+
+
+def partial_evaluation(V, next_idx, reward, non_term, gamma: float = 1.0, k: int = 20):
+    """
+    ============================================================================
+    Evaluación parcial (in-place): a lo sumo `k` barridos de Bellman
+    ─────────────────────────────────────────────────────────────────────────────
+    Entradas
+      • V        : np.ndarray[float] — punto de partida; se actualiza in-place
+      • next_idx, reward, non_term, gamma : como en `evaluate_arrays`
+      • k        : número máximo de barridos
+
+    Salida
+      • delta    : Δ del último barrido (Δ = 0 si se alcanzó el punto fijo)
+    ============================================================================
+
+    Es el paso de evaluación de la iteración de políticas modificada: en
+    lugar de llevar V hasta v_π se aplican k barridos partiendo del V de la
+    política anterior.
+    """
+    non_term = np.asarray(non_term, dtype=np.int64)
+    delta    = 0.0
+
+    if _NATIVE_SWEEP:
+        for _ in range(k):
+            delta = _sweep(V, next_idx, reward, non_term, gamma)
+            if delta == 0.0:
+                break
+        return delta
+
+    r_nt, next_nt = reward[non_term], next_idx[non_term]
+    for _ in range(k):
+        V_new = r_nt + gamma * V[next_nt]
+        delta = np.abs(V_new - V[non_term]).max(initial=0.0)
+        V[non_term] = V_new
+        if delta == 0.0:
+            break
+    return delta
+
+
+_MIN_PARALLEL_STATES = 10_000   # por debajo, el costo de sincronizar hilos domina
+
+
+def _jacobi_threaded(V, next_idx, reward, non_term, gamma, theta, n_workers):
+    """
+    Barridos de Jacobi repartidos entre `n_workers` hilos: cada hilo escribe
+    un bloque disjunto de V_new leyendo el V_old compartido (NumPy libera el
+    GIL en el gather y la aritmética). Esperar a todos los bloques actúa
+    como barrera entre barridos; luego se intercambian los búferes.
+    """
+    blocks = np.array_split(non_term, n_workers)
+    V_new  = V.copy()
+
+    def update(blk):
+        nv         = reward[blk] + gamma * V[next_idx[blk]]
+        d          = np.abs(nv - V[blk]).max(initial=0.0)
+        V_new[blk] = nv
+        return d
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        while True:
+            delta = max(pool.map(update, blocks))
+            V, V_new = V_new, V             # `update` lee V/V_new del cierre
+            if delta < theta:
+                return V
+
+
+def _sweep(V, next_idx, reward, non_term, gamma):
+    """
+    Un barrido Gauss-Seidel in-place de V(s) ← r + γ·V(s') sobre `non_term`.
+    Devuelve Δ = max_s |v_anterior − V(s)|.
+    """
+    delta = 0.0
+    for k in range(non_term.shape[0]):
+        i  = non_term[k]
+        v  = V[i]
+        nv = reward[i] + gamma * V[next_idx[i]]
+        V[i] = nv
+        d = abs(v - nv)
+        if d > delta:
+            delta = d
+    return delta
+
+
+_NATIVE_SWEEP = njit is not None          # ¿hay un barrido compilado disponible?
+
+if njit is not None:
+    _sweep = njit(cache=True, fastmath=True)(_sweep)
+else:
+    try:                  # sin numba: extensión Cython si fue compilada (ver _sweep_cy.pyx)
+        from _sweep_cy import sweep as _sweep
+        _NATIVE_SWEEP = True
+    except ImportError:
+        pass
+
+
+def _sweep_report(V, next_idx, reward, non_term, gamma, states, labels):
+    """
+    Variante de `_sweep` con trazas: imprime s ─a→ s' y el nuevo V(s) para
+    cada estado cuyo valor cambió. Devuelve Δ.
+    """
+    delta = 0.0  # Δ ← 0
+
+    # ── a. Recorremos los estados no terminales del entorno
+    for i in non_term:
+
+        v  = V[i]                          # valor anterior
+        j  = next_idx[i]
+        gv = gamma * V[j]                  # γ·V(s'), se reutiliza en la traza
+
+        # ── b. Actualizar valor de estado: Bellman para políticas fijas
+        new_v = reward[i] + gv
+        V[i]  = new_v
+
+        # ── c. Actualizar máximo cambio observado
+        delta = max(delta, abs(v - new_v))
+
+        # ── d. Mostrar trazas si hubo cambio
+        if v != new_v:
+            print(f"  s:{states[i]} ─a:{labels[i]}→ s':{states[j]} | "
+                  f"r={reward[i]:+.3f}, γV(s')={gv:+.3f} → V(s)={new_v:+.3f}")
+
+    return delta
+
+
+def _solve_backward(next_idx, reward, non_term, gamma):
+    """
+    Evaluación exacta en una sola pasada hacia atrás, válida cuando todo
+    estado no terminal transita a un índice mayor (orden topológico).
+    Devuelve None si el orden de los estados no lo garantiza.
+    """
+    non_term = np.sort(np.asarray(non_term, dtype=np.int64))
+    if np.any(next_idx[non_term] <= non_term):
+        return None
+
+    V = np.zeros(len(next_idx))
+    _backward(V, next_idx, reward, non_term, gamma)
     return V
+
+
+def _backward(V, next_idx, reward, non_term, gamma):
+    """
+    V(s) ← r + γ·V(s') recorriendo `non_term` en orden decreciente de índice.
+    """
+    for k in range(non_term.shape[0] - 1, -1, -1):
+        i    = non_term[k]
+        V[i] = reward[i] + gamma * V[next_idx[i]]
+
+
+if njit is not None:
+    _backward = njit(cache=True)(_backward)
+
+
+def _solve_linear(next_idx, reward, non_term, gamma):
+    """
+    Resuelve (I − γP_π)V = r_π con P_π disperso (un 1 por fila no terminal).
+    """
+    from scipy.sparse import csr_matrix, identity
+    from scipy.sparse.linalg import spsolve
+
+    n    = len(next_idx)
+    rows = np.asarray(non_term, dtype=np.int64)
+    P    = csr_matrix((np.ones(len(rows)), (rows, next_idx[rows])), shape=(n, n))
+
+    return spsolve((identity(n, format="csr") - gamma * P).tocsc(), reward)
@@ -1,4 +1,8 @@
-from policy_evaluation import policy_evaluation
+import numpy as np
+
+from policy_evaluation import evaluate_arrays, partial_evaluation
+from tabular import TabularModel
+from value_iteration import greedy_arrays
 
 """
 # Alterna evaluación y mejora hasta que la política se estabiliza
@@ -39,7 +43,8 @@ return π, V
 """
 
 
-def policy_iteration(env, policy, gamma: float = 1.0, theta: float = 1e-8, report: bool = False):
+def policy_iteration(env, policy, gamma: float = 1.0, theta: float = 1e-8, report: bool = False,
+                     k_eval: int = 20):
     """
     ============================================================================
     Algoritmo : Iteración de Políticas (versión determinista, in-place)
@@ -54,6 +59,8 @@ def policy_iteration(env, policy, gamma: float = 1.0, theta: float = 1e-8, repor
       • gamma    : factor de descuento γ ∈ (0,1]
       • theta    : precisión usada en policy_evaluation
       • report   : pasa la señal a policy_evaluation para trazas
+      • k_eval   : barridos de evaluación entre mejoras (iteración de políticas
+                   modificada). None → evaluación completa hasta Δ < θ
 
     Salida
       • policy   : política óptima π*
@@ -66,44 +73,61 @@ def policy_iteration(env, policy, gamma: float = 1.0, theta: float = 1e-8, repor
       2.  Mejora la política usando V      →  π ← greedy(V)
       3.  Si la política no cambió en ningún estado ⇒ convergencia
           de lo contrario, repetir desde 1
+
+    La dinámica del entorno se tabula una sola vez (`TabularModel`): cada
+    iteración trabaja sobre los arreglos next_idx / reward en lugar de volver
+    a llamar `sim_step` para cada par (s, a). La política recibida se
+    actualiza in-place al final, igual que antes.
+
+    Iteración de políticas modificada: con `k_eval` la evaluación solo aplica
+    k barridos partiendo del V anterior (ya cercano a v_π) en lugar de iterar
+    hasta Δ < θ. Se termina cuando la política no cambia **y** el último
+    barrido cumple Δ < θ, así que V final tiene la misma precisión. Con
+    `report=True` se usa la evaluación completa para conservar las trazas.
     """
 
+    # -------------------------------------------------------------------------
+    # 0. PRE-CÓMPUTO: tablas de transición y recompensa (se simula una sola vez)
+    # -------------------------------------------------------------------------
+    model = TabularModel(env)             # next_idx, reward, valid  (|S| × |A|)
+    rows  = np.arange(model.n)
+    pol   = model.policy_to_array(policy) # π como columna de acción por estado
+    V     = np.zeros(model.n)
+    full  = k_eval is None or report      # evaluación completa (clásica)
+
     # -------------------------------------------------------------------------
     # 1. BUCLE PRINCIPAL: iterar hasta estabilizar la política
     # -------------------------------------------------------------------------
     while True:
 
-        # ── 1.a Evaluación de la política actual: V ← v_π
-        V = policy_evaluation(env, policy, gamma, theta, report)
-
-        # ── 1.b Mejora de la política: π ← greedy(V)
-        policy_stable = True  # bandera para verificar cambios en π
-
-        for s in env.state_space():
-
-            if env.is_terminal(s):  # omitimos terminales
-                continue
-
-            old_a = policy[s]       # acción actual según la política
-
-            # ── Buscar la mejor acción (greedy respecto a V)
-            best_q = -float('inf')
-            best_a = None
-
-            for a in env.actions(s):
-                next_s, r = env.sim_step(s, a)     # transición determinista s ─a→ s'
-                q_sa = r + gamma * V[next_s]       # Qπ(s,a) = r + γ·V(s')
-
-                if q_sa > best_q:                  # maximizar Qπ(s,a)
-                    best_q, best_a = q_sa, a
-
-            # ── Actualizar π(s) ← argmax_a Qπ(s,a)
-            policy[s] = best_a
-
-            # ── Si la acción cambió, marcar política como inestable
-            if best_a != old_a:
-                policy_stable = False
+        # ── 1.a Evaluación de la política actual: V ← v_π  (o k barridos hacia v_π)
+        next_pi, r_pi = model.next_idx[rows, pol], model.reward[rows, pol]
+        if full:
+            labels = ({i: model.actions[i][pol[i]] for i in model.non_term}
+                      if report else None)
+            V = evaluate_arrays(next_pi, r_pi, model.non_term, gamma, theta,
+                                report=report, states=model.states, labels=labels)
+            delta = 0.0
+        else:
+            delta = partial_evaluation(V, next_pi, r_pi, model.non_term, gamma, k_eval)
+
+        # ── 1.b Mejora de la política: π ← greedy(V), para todos los estados a la vez
+        #        Qπ(s,a) = r + γ·V(s');  primera acción en caso de empate
+        new_pol, q_best = greedy_arrays(V, model.next_idx, model.reward, model.valid,
+                                        gamma, return_values=True)
+
+        # ── Si la acción cambió en algún estado no terminal, π es inestable
+        nt = model.non_term
+        policy_stable = np.array_equal(new_pol[nt], pol[nt])
+        pol[:] = new_pol
 
         # ── 1.c Verificar convergencia: si π no cambió en ningún estado
-        if policy_stable:
-            return policy, V
+        #        (y, en la versión modificada, V ya es un punto fijo: Δ < θ)
+        if policy_stable and delta < theta:
+            policy.update(model.policy_to_dict(pol))
+            return policy, model.values_to_dict(V)
+
+        # ── 1.d Reutilizar Q: Q(s, π_nuevo(s)) = r + γ·V(s') ya es un barrido de
+        #        evaluación de la nueva política; la evaluación parcial parte de ahí
+        if not full:
+            V[nt] = q_best[nt]
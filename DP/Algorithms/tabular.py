@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class TabularModel:
+    """
+    ============================================================================
+    Modelo tabular de un entorno determinista finito
+    ─────────────────────────────────────────────────────────────────────────────
+    Recorre el entorno **una sola vez** y guarda su dinámica en arreglos
+    contiguos, de modo que los algoritmos de DP (evaluación / iteración de
+    políticas, iteración de valores) trabajen con índices enteros en lugar de
+    llamar `sim_step` en cada barrido.
+
+    Representación
+    --------------
+    • Estados   : entero i ∈ {0 … n−1} en el orden de `env.state_space()`
+    • Acciones  : columna j ∈ {0 … A−1} = posición de la acción en `env.actions(s)`
+                  (A = máximo número de acciones legales en un estado)
+
+    Arreglos
+    --------
+    • next_idx[i, j] : índice de s' = sim_step(s_i, a_j)   (int32, n × A)
+    • reward[i, j]   : recompensa r de la transición       (float64, n × A)
+    • valid[i, j]    : True si a_j es legal en s_i         (bool, n × A)
+    • terminal[i]    : True si s_i es terminal             (bool, n)
+    • non_term       : índices de los estados no terminales
+
+    Las celdas inválidas apuntan al propio estado con r = 0, de modo que
+    `V[next_idx]` siempre es un acceso seguro. Todas las tablas son
+    C-contiguas; los índices en int32 reducen a la mitad el tráfico de
+    memoria del gather V[next_idx].
+
+    Requisitos del entorno `env`
+    ----------------------------
+        state_space(), is_terminal(s), actions(s), sim_step(s, a)
+
+    Si el entorno ya expone sus tablas precalculadas (`P_next`, `R`, `valid`,
+    `terminal_mask`, indexadas igual que `state_space()` y `actions(s)`, como
+    InventoryEnv), se adoptan directamente y no se llama `sim_step` ni
+    `is_terminal`.
+    ============================================================================
+    """
+
+    def __init__(self, env):
+        """
+        Construye las tablas de transición y recompensa del entorno.
+
+        Parámetros:
+        -----------
+        env : entorno determinista compatible (ver docstring de la clase)
+        """
+        # --- 1. Indexar estados
+        self.states = tuple(env.state_space())
+        self.index  = {s: i for i, s in enumerate(self.states)}
+        self.n      = len(self.states)
+
+        # --- 2. Acciones legales por estado (tupla vacía en terminales)
+        # Las acciones salen de env.actions(s): si el entorno ofrece una versión
+        # de sim_step sin validación, se usa esa
+        sim = getattr(env, "_sim_step_unchecked", env.sim_step)
+        mask = getattr(env, "terminal_mask", None)
+        if mask is not None:                  # máscara precalculada por el entorno
+            self.terminal = np.array(mask, dtype=bool)
+        else:
+            self.terminal = np.fromiter((env.is_terminal(s) for s in self.states),
+                                        dtype=bool, count=self.n)
+        self.actions  = []
+        for i, s in enumerate(self.states):
+            if self.terminal[i]:
+                self.actions.append(())
+                continue
+            acts = tuple(env.actions(s))
+            if not acts:
+                raise ValueError(f"El estado no terminal {s} no tiene acciones legales.")
+            self.actions.append(acts)
+
+        self.non_term  = np.flatnonzero(~self.terminal)
+        self.n_actions = max((len(a) for a in self.actions), default=0)
+
+        # --- 3. Tablas (n × A): por defecto cada celda apunta a sí misma con r = 0
+        shape = (self.n, max(self.n_actions, 1))
+
+        if all(hasattr(env, k) for k in ("P_next", "R", "valid")):
+            # Entorno con tablas propias: solo recortar columnas sobrantes
+            self.next_idx = np.ascontiguousarray(env.P_next[:, :shape[1]], dtype=np.int32)
+            self.reward   = np.ascontiguousarray(env.R[:, :shape[1]], dtype=np.float64)
+            self.valid    = np.ascontiguousarray(env.valid[:, :shape[1]], dtype=bool)
+            return
+
+        self.next_idx = np.repeat(np.arange(self.n, dtype=np.int32)[:, None], shape[1], axis=1)
+        self.reward   = np.zeros(shape, dtype=np.float64)
+        self.valid    = np.zeros(shape, dtype=bool)
+
+        for i in self.non_term:
+            s = self.states[i]
+            for j, a in enumerate(self.actions[i]):
+                next_s, r = sim(s, a)
+                self.next_idx[i, j] = self.index[next_s]
+                self.reward[i, j]   = r
+                self.valid[i, j]    = True
+
+    def __repr__(self):
+        """
+        Representación legible del modelo.
+        """
+        return (f"TabularModel(#_Estados = {self.n}, "
+                f"#_Acciones_max = {self.n_actions})")
+
+    # =========================================================================
+    # CONVERSIONES ENTRE dict[State, ·] Y ARREGLOS
+    # =========================================================================
+    def policy_to_array(self, policy):
+        """
+        Convierte una política dict[State, Action] en un arreglo de columnas
+        (posición de la acción en `actions(s)`). Terminales → 0.
+        """
+        pol = np.zeros(self.n, dtype=np.int64)
+        for i in self.non_term:
+            s = self.states[i]
+            try:
+                pol[i] = self.actions[i].index(policy[s])
+            except ValueError:
+                raise ValueError(f"Acción ilegal {policy[s]!r} en el estado {s}.") from None
+        return pol
+
+    def policy_to_dict(self, pol):
+        """
+        Convierte un arreglo de columnas en una política dict[State, Action]
+        (solo estados no terminales).
+        """
+        return {self.states[i]: self.actions[i][pol[i]] for i in self.non_term}
+
+    def values_to_dict(self, V):
+        """
+        Convierte un arreglo de valores en dict[State, float].
+        """
+        return dict(zip(self.states, np.asarray(V, dtype=float).tolist()))
@@ -25,7 +25,17 @@ para cada s ∈ S:
 return π*, V
 """
 
-def value_iteration(env, gamma=1.0, theta=1e-8):
+import numpy as np
+
+from tabular import TabularModel
+
+try:                      # numba es opcional: compila los barridos a código nativo
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def value_iteration(env, gamma=1.0, theta=1e-8, parallel: bool = False):
     """
     ============================================================================
     Algoritmo : Iteración de Valores (control óptimo, versión determinista)
@@ -38,6 +48,8 @@ def value_iteration(env, gamma=1.0, theta=1e-8):
                    ▸ actions(s)            → Iterable[Action]
       • gamma  : factor de descuento γ ∈ [0,1]
       • theta  : umbral de convergencia θ > 0
+      • parallel : si es True (y numba está disponible) usa barridos de Jacobi
+                   repartidos entre todos los núcleos (`_vi_sweep_parallel`)
 
     Salida
       • policy : política óptima π*
@@ -52,63 +64,186 @@ def value_iteration(env, gamma=1.0, theta=1e-8):
             ▸ Δ ← max_s |v_antiguo - V(s)|
       3.  Deriva π*(s) ← argmax_a [ r + γ·V(s′) ]
       4.  Devuelve (π*, V)
+
+    La dinámica se tabula una sola vez (`TabularModel`). Con numba cada
+    barrido es un bucle Gauss-Seidel compilado (`_vi_sweep`); sin numba es un
+    respaldo de Bellman vectorizado sobre todos los estados a la vez:
+            Q = reward + γ·V[next_idx]     (acciones ilegales → −∞)
+            V_nuevo = max_a Q
+
+    Gauss-Seidel vs. Jacobi: Gauss-Seidel reutiliza en el mismo barrido los
+    valores recién actualizados, pero es secuencial. Jacobi lee solo V_viejo
+    y escribe V_nuevo, así que cada estado es independiente y el barrido se
+    paraleliza con `prange`. En general Jacobi necesita algunas iteraciones
+    más; en estos entornos (estados ordenados por etapa, s' siempre en la
+    etapa siguiente) ambos convergen en el mismo número de barridos.
     """
 
+    # -------------------------------------------------------------------------
+    # 0. PRE-CÓMPUTO: tablas de transición y recompensa (se simula una sola vez)
+    # -------------------------------------------------------------------------
+    model = TabularModel(env)             # next_idx, reward, valid  (|S| × |A|)
+    nt    = model.non_term
+
     # -------------------------------------------------------------------------
     # 1. INICIALIZACIÓN: V(s) ← 0 para todos los estados
     # -------------------------------------------------------------------------
-    V = {s: 0.0 for s in env.state_space()}
+    V = np.zeros(model.n)
 
     # -------------------------------------------------------------------------
     # 2. ITERACIÓN DE VALORES: actualizar V hasta convergencia (Δ < θ)
     # -------------------------------------------------------------------------
-    while True:
-        delta = 0.0  # Δ ← 0 (máximo cambio en esta iteración)
-
-        for s in env.state_space():
-            if env.is_terminal(s):         # omitimos terminales
-                continue
+    if njit is not None and parallel:
+        # ── Barridos de Jacobi en paralelo: V_old → V_new, luego se intercambian
+        V_new = V.copy()
+        while True:
+            _vi_sweep_parallel(V, V_new, model.next_idx, model.reward, model.valid, nt, gamma)
+            delta = np.abs(V_new[nt] - V[nt]).max(initial=0.0)
+            V, V_new = V_new, V
+            if delta < theta:
+                break
+
+    elif njit is not None:
+        # ── Barridos Gauss-Seidel compilados (in-place sobre V)
+        while _vi_sweep(V, model.next_idx, model.reward, model.valid, nt, gamma) >= theta:
+            pass
+
+    else:
+        # Filas no terminales contiguas y un búfer Q reutilizado en cada barrido
+        next_nt = np.ascontiguousarray(model.next_idx[nt])
+        r_nt    = np.ascontiguousarray(model.reward[nt])
+        ilegal  = ~model.valid[nt]
+        Q       = np.empty(r_nt.shape)
+
+        while True:
+
+            # ── 2.a Q(s,a) = r + γ·V(s') para todos los pares; ilegales → −∞
+            #        (gather, producto y suma in-place sobre el mismo búfer)
+            np.take(V, next_nt, out=Q)
+            Q *= gamma
+            Q += r_nt
+            Q[ilegal] = -np.inf
+
+            # ── 2.b V(s) ← max_a Q(s,a) en los no terminales (terminales quedan en 0)
+            V_new = Q.max(axis=1)
+
+            # ── 2.c Máximo cambio observado Δ y actualización
+            delta = np.abs(V_new - V[nt]).max(initial=0.0)
+            V[nt] = V_new
+
+            # ── 2.d Criterio de parada
+            if delta < theta:
+                break
 
-            # ── 2.a Almacenar valor previo
-            v = V[s]
-
-            # ── 2.b Calcular el mejor retorno esperado
-            best_q = max(
-                (env.sim_step(s, a)[1] + gamma * V[env.sim_step(s, a)[0]])
-                for a in env.actions(s)
-            )
-
-            # ── 2.c Actualizar V(s) ← best_q
-            V[s] = best_q
-
-            # ── 2.d Actualizar el máximo cambio observado Δ
-            delta = max(delta, abs(v - best_q))
-
-        # ── 2.e Criterio de parada
-        if delta < theta:
-            break
+    # -------------------------------------------------------------------------
+    # 3. DERIVAR POLÍTICA ÓPTIMA π*(s) ← argmax_a Q(s,a)  (primera en empates)
+    # -------------------------------------------------------------------------
+    pol    = greedy_arrays(V, model.next_idx, model.reward, model.valid, gamma)
+    policy = model.policy_to_dict(pol)
 
     # -------------------------------------------------------------------------
-    # 3. DERIVAR POLÍTICA ÓPTIMA π*(s) ← argmax_a Q(s,a)
+    # 4. SALIDA: política y función de valor óptimas
     # -------------------------------------------------------------------------
-    policy = {}
+    return policy, model.values_to_dict(V)
 
-    for s in env.state_space():
-        if env.is_terminal(s):
-            continue
 
-        best_a, best_q = None, -float('inf')
+def greedy_arrays(V, next_idx, reward, valid, gamma: float = 1.0, return_values: bool = False):
+    """
+    ============================================================================
+    Política voraz respecto de V sobre las tablas de un `TabularModel`
+    ─────────────────────────────────────────────────────────────────────────────
+    Entradas
+      • V        : np.ndarray[float] — valores por índice de estado
+      • next_idx : np.ndarray[int]   (n × A) — índice de s' por (s, a)
+      • reward   : np.ndarray[float] (n × A) — recompensa por (s, a)
+      • valid    : np.ndarray[bool]  (n × A) — acciones legales
+      • gamma    : factor de descuento γ
+      • return_values : si es True devuelve también max_a Q(s,a)
 
-        for a in env.actions(s):
-            next_s, r = env.sim_step(s, a)
-            q_sa = r + gamma * V[next_s]
+    Salida
+      • pol      : np.ndarray[int] — columna argmax_a [ r + γ·V(s') ] por estado
+                   (primera acción en caso de empate; 0 si no hay acciones)
+      • q_best   : np.ndarray[float] — Q(s, pol[s]) (solo con return_values;
+                   0 en estados sin acciones)
+    ============================================================================
 
-            if q_sa > best_q:
-                best_q, best_a = q_sa, a
+    La usan `value_iteration` (fase 2) y `policy_iteration` (mejora). q_best
+    es justamente un barrido de evaluación de la nueva política partiendo de V,
+    así la iteración de políticas modificada lo reutiliza en vez de recalcularlo.
+    """
+    if njit is not None:
+        pol, q_best = _greedy(V, next_idx, reward, valid, gamma)
+    else:
+        Q      = np.where(valid, reward + gamma * V[next_idx], -np.inf)
+        pol    = Q.argmax(axis=1)
+        q_best = np.where(valid.any(axis=1), Q[np.arange(len(pol)), pol], 0.0)
 
-        policy[s] = best_a
+    return (pol, q_best) if return_values else pol
 
-    # -------------------------------------------------------------------------
-    # 4. SALIDA: política y función de valor óptimas
-    # -------------------------------------------------------------------------
-    return policy, V
+
+def _vi_sweep(V, next_idx, reward, valid, non_term, gamma):
+    """
+    Un barrido Gauss-Seidel in-place de V(s) ← max_a [ r + γ·V(s') ] sobre
+    `non_term`. Devuelve Δ = max_s |v_anterior − V(s)|.
+    """
+    delta = 0.0
+    for k in range(non_term.shape[0]):
+        i    = non_term[k]
+        best = -np.inf
+        for j in range(next_idx.shape[1]):
+            if valid[i, j]:
+                q = reward[i, j] + gamma * V[next_idx[i, j]]
+                if q > best:
+                    best = q
+        d    = abs(V[i] - best)
+        V[i] = best
+        if d > delta:
+            delta = d
+    return delta
+
+
+def _vi_sweep_parallel(V_old, V_new, next_idx, reward, valid, non_term, gamma):
+    """
+    Un barrido de Jacobi: V_new(s) ← max_a [ r + γ·V_old(s') ] sobre `non_term`.
+    Cada estado escribe solo su propia entrada, por eso el bucle es `prange`.
+    """
+    for k in prange(non_term.shape[0]):
+        i    = non_term[k]
+        best = -np.inf
+        for j in range(next_idx.shape[1]):
+            if valid[i, j]:
+                q = reward[i, j] + gamma * V_old[next_idx[i, j]]
+                if q > best:
+                    best = q
+        V_new[i] = best
+
+
+def _greedy(V, next_idx, reward, valid, gamma):
+    """
+    Núcleo de `greedy_arrays`: argmax por fila recorriendo solo las acciones
+    legales (la primera estrictamente mejor gana los empates). Devuelve la
+    política y el Q de la acción elegida.
+    """
+    n, A   = next_idx.shape
+    pol    = np.zeros(n, dtype=np.int64)
+    q_best = np.zeros(n)
+    for i in range(n):
+        best = -np.inf
+        for j in range(A):
+            if valid[i, j]:
+                q = reward[i, j] + gamma * V[next_idx[i, j]]
+                if q > best:
+                    best   = q
+                    pol[i] = j
+        if best > -np.inf:
+            q_best[i] = best
+    return pol, q_best
+
+
+if njit is not None:
+    # fastmath solo con "contract": permite fusionar r + γ·V(s') en una FMA sin
+    # suponer ausencia de infinitos (los núcleos comparan contra −∞)
+    _FM = {"contract"}
+    _vi_sweep          = njit(cache=True, fastmath=_FM)(_vi_sweep)
+    _vi_sweep_parallel = njit(cache=True, fastmath=_FM, parallel=True)(_vi_sweep_parallel)
+    _greedy            = njit(cache=True, fastmath=_FM)(_greedy)
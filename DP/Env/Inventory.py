@@ -1,4 +1,43 @@
-import matplotlib.pyplot as plt
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from state_grid import StateGrid
+
+try:                      # numba es opcional: compila la inducción hacia atrás
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+_MILLI = 1000   # escala de punto fijo de los costos (milésimas)
+
+
+def _to_milli(costs, name):
+    """
+    Costos en milésimas (int64) para fixed_point=True. Error si alguno tiene
+    más de 3 decimales: en punto fijo no se redondea en silencio.
+    """
+    scaled = np.asarray(costs, dtype=np.float64) * _MILLI
+    milli  = np.round(scaled)
+    if not np.allclose(scaled, milli, rtol=0.0, atol=1e-6):
+        raise ValueError(f"`{name}` tiene costos con más de 3 decimales; "
+                         f"fixed_point=True no admite redondearlos.")
+    return milli.astype(np.int64)
+
+
+def _inv_step(S, x, d, c, h):
+    """
+    Un período de inventario: (I_t, c·x + h·I_t) con I_t = S + x − d.
+    """
+    I_t = S + x - d
+    return I_t, c * x + h * I_t
+
+
+try:                      # extensión Cython si fue compilada (ver _kernels.pyx)
+    from _kernels import inv_step as _inv_step
+except ImportError:
+    pass
 
 
 class InventoryEnv:
@@ -26,6 +65,8 @@ class InventoryEnv:
                    ▸ min_pedido = max(0, demanda[t] − S)   (evita faltantes)
                    ▸ max_pedido = capacidad − S            (respeta límite superior)
                    Si min_pedido > max_pedido ⇒ problema infactible en ese estado.
+                   Con assume_wagner_whitin=True solo se ofrecen los pedidos
+                   candidatos de Wagner-Whitin (ver _compute_actions).
     
     • Recompensa : −(costo_producción[t] * x + costo_almacenamiento[t] * I_t)
                    donde I_t = S + x − demanda[t]
@@ -33,13 +74,18 @@ class InventoryEnv:
     • Transición : determinista. Avanza a (t+1, I_t).
     
     • Episodio   : duración fija de n pasos (uno por período t = 0 … n−1).
+
+    • Tablas     : P_next, R, valid — dinámica completa para los algoritmos
+                   de DP, calculada en el primer acceso (ver _build_tables).
+                   terminal_mask — estados terminales por índice entero.
     ============================================================================
     """
 
     # =========================================================================
     # 1. INICIALIZACIÓN DEL ENTORNO
     # =========================================================================
-    def __init__(self, demand, production_costs, holding_costs, capacity, start_inventory=0):
+    def __init__(self, demand, production_costs, holding_costs, capacity, start_inventory=0,
+                 assume_wagner_whitin=False, fixed_point=False):
         """
         Constructor del entorno.
 
@@ -50,6 +96,15 @@ class InventoryEnv:
         holding_costs     : lista de costos de almacenamiento h_t por período (longitud n)
         capacity          : capacidad máxima del inventario (entero ≥ 0)
         start_inventory   : inventario inicial I0 (0 … capacity)
+        assume_wagner_whitin : si es True, poda las acciones dominadas según
+                            Wagner-Whitin: cada pedido cubre exactamente uno o
+                            más períodos de demanda neta de S (válida con costos
+                            cóncavos en la cantidad pedida y capacidad no
+                            restrictiva; si la capacidad limita, la política
+                            resultante puede ser subóptima)
+        fixed_point       : si es True, lleva además `total_reward_scaled`, la
+                            recompensa acumulada exacta en milésimas (int).
+                            Exige costos con a lo sumo 3 decimales
         """
         # --- 1.1 Validaciones de tamaño
         self.demand           = list(map(int, demand))
@@ -68,16 +123,156 @@ class InventoryEnv:
         assert 0 <= start_inventory <= self.capacity, \
             "Inventario inicial fuera de rango [0, capacity]."
         self.start_inventory = int(start_inventory)
-
-        # --- 1.3 Estado actual (se actualiza con reset() / step())
+        self.assume_wagner_whitin = bool(assume_wagner_whitin)
+
+        # --- 1.3 Costos en punto fijo (opcional, milésimas int64): con demandas y
+        #         pedidos enteros, total_reward_scaled suma exacto (sin deriva de FP)
+        self.fixed_point = bool(fixed_point)
+        self._c_milli = self._h_milli = None
+        if self.fixed_point:
+            self._c_milli = _to_milli(self.production_costs, "production_costs")
+            self._h_milli = _to_milli(self.holding_costs, "holding_costs")
+
+        #         Copias NumPy de los parámetros por período (para cost_vec)
+        self._c_arr = np.asarray(self.production_costs, dtype=np.float64)
+        self._h_arr = np.asarray(self.holding_costs, dtype=np.float64)
+        self._d_arr = np.asarray(self.demand, dtype=np.int64)
+
+        # --- 1.4 Estado actual (se actualiza con reset() / step())
         self.t = None                 # Período actual (0 … n)
         self.S = None                 # Inventario al inicio de t
         self.total_reward = None      # Acumulador de recompensas
+        self.total_reward_scaled = None   # Mismo acumulador en milésimas (solo fixed_point)
+
+        # --- 1.5 Espacio de estados (pares válidos (t, S)), generado bajo demanda
+        self._states = StateGrid.shared(self.n, self.capacity)
 
-        # --- 1.4 Espacio de estados (pares válidos (t, S))
-        self._states = [(t, s)
-                        for t in range(self.n + 1)
-                        for s in range(self.capacity + 1)]
+        # --- 1.6 Codificación entera de estados (SoA): i = t·(capacity+1) + S
+        #         _state_ids es el espacio de estados empaquetado (4 bytes por
+        #         estado); _t_of[i], _S_of[i] recuperan las componentes sin tuplas
+        self._state_ids = np.arange(len(self._states), dtype=np.int32)
+        self._t_of, self._S_of = np.divmod(self._state_ids, self.capacity + 1)
+
+        #         terminal_mask[i] ≡ is_terminal(decode(i)), sin llamadas por estado
+        self.terminal_mask = self._t_of >= self.n
+
+        # --- 1.7 Caché de acciones legales por (t, S): la consultan step(),
+        #         sim_step() y los algoritmos de DP en cada barrido
+        self._actions_for = lru_cache(maxsize=None)(self._compute_actions)
+
+        #         Resolvedor especializado para esta instancia (compile_solver)
+        self._solver = None
+
+        # --- 1.8 Tablas de transición (índice de estado i = t·(capacity+1) + S,
+        #         columna j = x − min_pedido): se construyen en el primer acceso
+        #         a P_next, R, valid, … (ver _build_tables), no aquí
+        self._tables = None
+
+    def encode(self, t, S):
+        """
+        Índice entero del estado (t, S): i = t·(capacity+1) + S.
+        Es la fila correspondiente en P_next / R / valid y la posición del
+        estado en state_space().
+        """
+        return t * (self.capacity + 1) + S
+
+    def decode(self, idx):
+        """
+        Inversa de encode(): devuelve la tupla (t, S) del índice `idx`.
+        """
+        return self._unpack(int(idx))
+
+    def _unpack(self, idx):
+        """
+        (t, S) = divmod(idx, capacity+1), sin consultar arreglos.
+        """
+        return divmod(idx, self.capacity + 1)
+
+    def _build_tables(self):
+        """
+        Precalcula la dinámica completa del entorno en arreglos contiguos,
+        sin bucles por estado (expresiones vectoriales sobre (|S|, capacity+1)):
+
+            P_next[i, j] : índice de (t+1, I_t) al pedir x = min_pedido + j   (int32)
+            R[i, j]      : recompensa −(c_t·x + h_t·I_t)                       (float64)
+            valid[i, j]  : True si x es un pedido legal en el estado i          (bool)
+
+        con forma (|S|, capacity+1). Las celdas inválidas (terminales, estados
+        infactibles y columnas sobrantes) apuntan al propio estado con r = 0.
+        La columna j coincide con la posición de x en `actions(s)`, de modo
+        que los algoritmos de DP pueden trabajar directamente con las tablas.
+        X[i, j] guarda el pedido x de cada celda.
+
+        Además expone las mismas tablas indexadas por período, (n+1, capacity+1,
+        capacity+1): R_t, X_t, valid_t y Snext_t (inventario siguiente). Así
+        una etapa de inducción hacia atrás es una sola expresión:
+            V[t] = max_j ( R_t[t] + γ·V[t+1][Snext_t[t]] )   (solo celdas válidas)
+        Con `assume_wagner_whitin` la matriz de pedidos X se llena fila por
+        fila con las acciones podadas (pocas por estado).
+        """
+        width = self.capacity + 1
+        ids   = self._state_ids
+
+        # --- Parámetros del período de cada estado (c_t, h_t, d_t), alineados con
+        #     el índice entero; los terminales (t = n) reciben 0
+        t, S = self._t_of, self._S_of
+        c_by_state = np.append(self.production_costs, 0.0)[t]
+        h_by_state = np.append(self.holding_costs, 0.0)[t]
+        d_by_state = np.append(self.demand, 0)[t]
+
+        # --- Matriz de pedidos X[i, j] = min_pedido(i) + j y su legalidad
+        d, c, h = d_by_state[:, None], c_by_state[:, None], h_by_state[:, None]
+        if self.assume_wagner_whitin:
+            X     = np.zeros((len(ids), width), dtype=np.int64)
+            valid = np.zeros((len(ids), width), dtype=bool)
+            for i in np.flatnonzero(~self.terminal_mask):
+                try:
+                    acts = self._actions_for(*self._unpack(int(i)))
+                except ValueError:              # estado infactible: sin acciones
+                    continue
+                X[i, :len(acts)]     = acts
+                valid[i, :len(acts)] = True
+        else:
+            lo    = np.maximum(0, d - S[:, None])            # min_pedido
+            X     = lo + np.arange(width)
+            valid = ~self.terminal_mask[:, None] & (X <= (self.capacity - S)[:, None])
+
+        I_t    = S[:, None] + X - d                          # inventario final
+        P_next = np.where(valid, (t[:, None] + 1) * width + I_t, ids[:, None]).astype(np.int32)
+        R      = np.where(valid, -(c * X + h * I_t), 0.0)
+
+        # --- Vistas por período (sin copia): eje 0 = t, eje 1 = S, eje 2 = j
+        #     Snext_t[t, S, j] es el inventario siguiente I_t (S en celdas inválidas),
+        #     en int16 si la capacidad lo permite (mitad de memoria que int32)
+        s_type = np.int16 if self.capacity <= np.iinfo(np.int16).max else np.int32
+        shape3 = (self.n + 1, width, width)
+        self._tables = dict(
+            X=X, P_next=P_next, R=R, valid=valid,
+            R_t=R.reshape(shape3), X_t=X.reshape(shape3), valid_t=valid.reshape(shape3),
+            Snext_t=np.where(valid, I_t, S[:, None]).astype(s_type).reshape(shape3),
+        )
+
+    def _table(name):
+        """
+        Propiedad de solo lectura para la tabla `name` de _build_tables(). Las
+        tablas ocupan O(n·capacity²): se construyen todas en el primer acceso
+        (p. ej. al resolver con DP), no al crear el entorno.
+        """
+        def get(self):
+            if self._tables is None:
+                self._build_tables()
+            return self._tables[name]
+        return property(get)
+
+    P_next  = _table("P_next")
+    R       = _table("R")
+    valid   = _table("valid")
+    X       = _table("X")
+    R_t     = _table("R_t")
+    X_t     = _table("X_t")
+    valid_t = _table("valid_t")
+    Snext_t = _table("Snext_t")
+    del _table
 
     @property
     def state(self):
@@ -108,17 +303,28 @@ class InventoryEnv:
 
         Retorna:
         --------
-        List[int] con cantidades legales a pedir en el período t.
-        Lista vacía en estado terminal (t == n).
+        range con cantidades legales a pedir en el período t (inmutable, se
+        guarda en caché por estado). Rango vacío en estado terminal (t == n).
         """
         if state is None:
             state = self.state
 
-        t, S = state
+        return self._actions_for(*state)
 
+    def _compute_actions(self, t, S):
+        """
+        Calcula el rango de pedidos legales en (t, S). Se invoca a través de
+        la caché `self._actions_for`, una sola vez por estado.
+
+        Con `assume_wagner_whitin` devuelve una tupla con los pedidos no
+        dominados: S + x cubre exactamente uno o más períodos completos, o no
+        se pide nada si S ya cubre d_t. Es decir, las necesidades netas
+            d_t − S, d_t+d_{t+1} − S, …   recortadas a [min_pedido, max_pedido]
+        (con S > 0 puede convenir pedir igual si c_t + h_t < c_{t+1}).
+        """
         # --- Estado terminal: no hay acciones
         if t >= self.n:
-            return []
+            return range(0)
 
         d_t = self.demand[t]
 
@@ -134,7 +340,14 @@ class InventoryEnv:
                 f"desde inventario {S} en período t={t}."
             )
 
-        return list(range(min_order, max_order + 1))
+        if self.assume_wagner_whitin:
+            # Necesidades netas: cubrir d_t, d_t+d_{t+1}, … descontando S; las
+            # que S ya cubre se recortan a min_pedido (= 0 si S ≥ d_t)
+            net = np.cumsum(self.demand[t:]) - S
+            net = np.maximum(net[net <= max_order], min_order)
+            return tuple(np.unique(net).tolist())
+
+        return range(min_order, max_order + 1)
 
     def step(self, x):
         """
@@ -154,21 +367,14 @@ class InventoryEnv:
         done : bool
             True si el episodio ha terminado (t+1 == n).
         """
-        # Validar acción
-        if x not in self.actions():
+        # Validar acción (pertenencia a un range: solo compara contra los límites)
+        if x not in self._actions_for(self.t, self.S):
             raise ValueError(f"Acción ilegal {x} en el estado {self.state}.")
 
         t, S = self.t, self.S
-        d_t  = self.demand[t]
-
-        # Dinámica de inventario
-        I_t = S + x - d_t              # Inventario al final del período t
-        # Por construcción de acciones(), I_t ∈ [0, capacity]
 
-        # Costo y recompensa
-        c_t = self.production_costs[t]
-        h_t = self.holding_costs[t]
-        cost = c_t * x + h_t * I_t
+        # Dinámica de inventario y costo (I_t ∈ [0, capacity] por construcción de acciones())
+        I_t, cost = self._cost(t, S, x)
         reward = -cost
 
         # Avanzar estado
@@ -176,6 +382,8 @@ class InventoryEnv:
         self.t = t_next
         self.S = I_t                   # Inventario final pasa a inventario inicial siguiente
         self.total_reward += reward
+        if self.fixed_point:
+            self.total_reward_scaled -= int(self._c_milli[t]) * x + int(self._h_milli[t]) * I_t
         done = (t_next == self.n)
 
         return self.state, reward, done
@@ -196,19 +404,50 @@ class InventoryEnv:
         next_state : tupla (t+1, S’)
         reward : float
         """
-        t, S = state
-        if x not in self.actions(state):
+        if x not in self._actions_for(*state):     # min_pedido ≤ x ≤ max_pedido
             raise ValueError(f"Acción ilegal {x} en el estado {state}.")
 
-        d_t = self.demand[t]
-        I_t = S + x - d_t
+        return self._sim_step_unchecked(state, x)
 
-        c_t = self.production_costs[t]
-        h_t = self.holding_costs[t]
-        cost = c_t * x + h_t * I_t
-        reward = -cost
+    def _sim_step_unchecked(self, state, x):
+        """
+        sim_step() sin validar la acción. Solo para quien ya garantiza que `x`
+        es legal en `state`, p. ej. al recorrer `actions(state)`.
+        """
+        t, S = state
+        I_t, cost = self._cost(t, S, x)
+
+        return (t + 1, I_t), -cost
+
+    def _cost(self, t, S, x):
+        """
+        Dinámica y costo de un período, compartidos por step() y sim_step():
+            I_t  = S + x − d_t
+            cost = c_t·x + h_t·I_t
+        Retorna la tupla (I_t, cost).
+        """
+        return _inv_step(S, x, self.demand[t], self.production_costs[t], self.holding_costs[t])
+
+    def cost_vec(self, t, S, x):
+        """
+        Versión vectorial de _cost(): costo c_t·x + h_t·(S + x − d_t) de muchos
+        pares (S, x) a la vez, sin ramas a nivel de Python.
+
+        Parámetros:
+        -----------
+        t : int o np.ndarray[int]
+            Período(s) 0 … n−1.
+        S, x : np.ndarray[int] (o escalares)
+            Inventarios iniciales y pedidos; se combinan por broadcasting.
 
-        return (t + 1, I_t), reward
+        Retorna:
+        --------
+        np.ndarray[float] con el costo de cada combinación. No valida la
+        legalidad de x (ver actions()).
+        """
+        t   = np.asarray(t)
+        I_t = np.asarray(S) + np.asarray(x) - self._d_arr[t]
+        return self._c_arr[t] * x + self._h_arr[t] * I_t
 
     # =========================================================================
     # 3. FUNCIONES AUXILIARES
@@ -224,6 +463,7 @@ class InventoryEnv:
         self.t = 0
         self.S = self.start_inventory
         self.total_reward = 0
+        self.total_reward_scaled = 0 if self.fixed_point else None
         return self.state
 
     def is_terminal(self, state=None):
@@ -243,21 +483,139 @@ class InventoryEnv:
             state = self.state
         return state[0] >= self.n
 
-    def state_space(self):
+    def solve_dp(self, gamma=1.0):
+        """
+        Resuelve el problema por inducción hacia atrás sobre las tablas por
+        período (R_t, Snext_t, valid_t): una sola pasada t = n−1 … 0, exacta,
+        sin iterar hasta convergencia. Con numba usa el núcleo compilado
+        `_inv_backward` (paralelo en S); sin numba, una expresión NumPy por etapa.
+
+        Parámetro:
+        ----------
+        gamma : float
+            Factor de descuento γ.
+
+        Retorna:
+        --------
+        policy : dict[(t, S) -> x]
+            Pedido óptimo en cada estado no terminal factible.
+        V : dict[(t, S) -> float]
+            Valor óptimo (−inf en estados infactibles).
+        """
+        backward = _inv_backward if njit is not None else _inv_backward_np
+        V, pi    = backward(self.R_t, self.Snext_t, self.valid_t, float(gamma))
+
+        return self._dp_output(V, pi)
+
+    def bellman_jax(self, V_next, t, gamma=1.0):
+        """
+        Una etapa del respaldo de Bellman en JAX (CPU/GPU), compilada con jit:
+
+            V_t(S) = max_j { R_t[t,S,j] + γ·V_next[Snext_t[t,S,j]] }   (celdas válidas)
+
+        Parámetros:
+        -----------
+        V_next : array (capacity+1,)
+            Valores de la etapa t+1.
+        t : int
+            Período a respaldar (0 … n−1).
+        gamma : float
+            Factor de descuento γ.
+
+        Retorna:
+        --------
+        (V_t, pi_t) como arreglos de JAX: valor y columna óptima por S.
+        """
+        stage, _ = _jax_kernels()
+        return stage(V_next, self.R_t[t], self.Snext_t[t], self.valid_t[t], gamma)
+
+    def solve_jax(self, gamma=1.0):
+        """
+        Igual que solve_dp(), pero la inducción hacia atrás completa corre en
+        JAX: `jax.lax.scan` recorre t = n−1 … 0 aplicando `bellman_jax` y XLA
+        fusiona recompensa + gather + máximo en un solo núcleo. Requiere `jax`
+        (opcional). Nota: JAX trabaja en float32 salvo que se active
+        `jax.config.update("jax_enable_x64", True)`.
+
+        Retorna:
+        --------
+        (policy, V) con el mismo formato que solve_dp().
+        """
+        _, backward = _jax_kernels()
+        V, pi = backward(self.R_t[:-1], self.Snext_t[:-1], self.valid_t[:-1], gamma)
+
+        W = self.capacity + 1
+        V  = np.vstack([np.asarray(V, dtype=np.float64), np.zeros((1, W))])
+        pi = np.vstack([np.asarray(pi, dtype=np.int64), np.zeros((1, W), dtype=np.int64)])
+        return self._dp_output(V, pi)
+
+    def compile_solver(self):
+        """
+        Genera y compila un resolvedor de inducción hacia atrás especializado
+        para esta instancia: capacidad, horizonte y los parámetros (d_t, c_t,
+        h_t) de cada período quedan escritos como literales en el código
+        fuente (ver _specialized_source), que se compila con `exec` y, si
+        numba está disponible, con `njit`. Los límites de los bucles son
+        constantes, así que el compilador puede desenrollarlos y plegarlos.
+
+        El resolvedor recorre el rango completo de pedidos (no aplica la poda
+        de Wagner-Whitin). Se construye una vez por instancia y queda en caché.
+
+        Retorna:
+        --------
+        solve(gamma) -> (V, x_opt)
+            Arreglos (n+1, capacity+1): valor óptimo de cada estado y pedido
+            óptimo (−1 en estados infactibles y terminales).
+        """
+        if self._solver is None:
+            scope = {"np": np}
+            exec(_specialized_source(self.demand, self.production_costs,
+                                     self.holding_costs, self.capacity), scope)
+            solve = scope["solve"]
+            self._solver = njit(solve) if njit is not None else solve
+        return self._solver
+
+    def _dp_output(self, V, pi):
+        """
+        Convierte (V, pi) de forma (n+1, capacity+1) en (policy, V) como dict:
+        pedido óptimo en cada estado factible y valor de cada estado.
+        """
+        feasible = self.valid.any(axis=1)
+        policy   = {self._states[i]: int(self.X[i, pi.flat[i]])
+                    for i in np.flatnonzero(feasible)}
+
+        return policy, dict(zip(self._states, V.ravel().tolist()))
+
+    def state_space(self, packed=False):
         """
         Devuelve todos los estados posibles (t, S) del entorno.
 
+        Parámetro:
+        ----------
+        packed : bool
+            Si es True devuelve los índices empaquetados i = t·(capacity+1) + S
+            (np.ndarray[int32], ver encode/decode) en lugar de tuplas.
+
         Retorna:
         --------
-        List[tuple]
+        StateGrid — secuencia de tuplas (t, S) sin materializar
+        (o np.ndarray[int32] si packed=True)
+        """
+        return self._state_ids if packed else self._states
+
+    def state_array(self):
+        """
+        Estados como arreglo int32 de forma (|S|, 2), columnas (t, S), en el
+        orden de state_space(). Se calcula una vez y queda en caché.
         """
-        return self._states
+        return self._states.state_array()
 
     def report_from_policy(self, policy, month_labels=None):
         """
-        Ejecuta un episodio completo usando una política dada, imprime métricas
-        agregadas (FO, total producción, total inventario) y genera el gráfico
-        solicitado (demanda área + barras apiladas inventario/producción).
+        Ejecuta un episodio completo usando una política dada e imprime métricas
+        agregadas (FO, total producción, total inventario). No grafica: el plan
+        se visualiza con `plot_plan_produccion` (Instances/InsInventory.py) a
+        partir de los valores devueltos.
 
         Parámetros
         ----------
@@ -272,15 +630,159 @@ class InventoryEnv:
         -------
         obj_lp : float
             Valor de la función objetivo (costo total) Σ_t (c_t x_t + h_t I_t).
-        produccion : list[float]
-            Lista de cantidades pedidas/producidas por período.
-        inventario : list[float]
-            Lista del inventario *inicial* de cada período (estado S).
-            (Cambia a inv_final si quieres reportar I_t post-demanda.)
+        costos_prod : list[float]
+            Costo de producción c_t·x_t de cada período.
+        costos_inv : list[float]
+            Costo de almacenamiento h_t·I_t de cada período.
+        produccion : dict[int, int]
+            Cantidad pedida/producida por período (claves 1 … n).
+        inventario : dict[int, int]
+            Inventario *inicial* de cada período (estado S), claves 1 … n.
+        trayecto : list[dict]
+            Una fila por período con t, mes, inv_ini, pedido, demanda,
+            inv_fin y costo.
         """
         # ------------------------------------------------------------------
         # 1. Preparar etiquetas de meses
         # ------------------------------------------------------------------
+        month_labels = self._month_labels(month_labels)
+
+        # ------------------------------------------------------------------
+        # 2. Simular episodio completo según la política (bucle único con
+        #    variables locales: sin step(), sin listas que crecen con append)
+        # ------------------------------------------------------------------
+        n, demand    = self.n, self.demand
+        actions_for  = self._actions_for
+
+        inv_start = np.empty(n, dtype=np.int64)   # inventario al inicio (estado S)
+        orders    = np.empty(n, dtype=np.int64)   # acción x_t
+        inv_end   = np.empty(n, dtype=np.int64)   # inventario final I_t
+
+        S = self.start_inventory
+        for t in range(n):
+            try:
+                x = policy[(t, S)]
+            except KeyError:
+                raise KeyError(f"La política no define acción para el estado {(t, S)}.") from None
+            if x not in actions_for(t, S):
+                raise ValueError(f"Acción ilegal {x} en el estado {(t, S)}.")
+
+            inv_start[t], orders[t] = S, x
+            S = S + x - demand[t]                 # I_t: inventario final del período t
+            inv_end[t] = S
+
+        return self._report_episode(month_labels, inv_start, orders, inv_end)
+
+    def report_from_policy_arr(self, pi_arr, month_labels=None):
+        """
+        Igual que report_from_policy(), pero con la política como arreglo
+        denso: x = pi_arr[t, S]. Indexar un arreglo evita construir y hashear
+        la tupla (t, S) en cada período.
+
+        Parámetros
+        ----------
+        pi_arr : array int, forma (n, capacity+1)
+            Pedido a realizar en cada estado (t, S); −1 si no está definido.
+            Se obtiene de una política dict con dict_policy_to_array().
+        month_labels : list[str], opcional
+            Igual que en report_from_policy().
+
+        Retorna
+        -------
+        La misma tupla que report_from_policy().
+        """
+        # ------------------------------------------------------------------
+        # 1. Preparar etiquetas de meses
+        # ------------------------------------------------------------------
+        month_labels = self._month_labels(month_labels)
+
+        # ------------------------------------------------------------------
+        # 2. Simular episodio completo según la política (índice directo
+        #    pi_arr[t, S]: sin tuplas ni hashing por período)
+        # ------------------------------------------------------------------
+        n, demand    = self.n, self.demand
+        actions_for  = self._actions_for
+
+        inv_start = np.empty(n, dtype=np.int64)   # inventario al inicio (estado S)
+        orders    = np.empty(n, dtype=np.int64)   # acción x_t
+        inv_end   = np.empty(n, dtype=np.int64)   # inventario final I_t
+
+        S = self.start_inventory
+        for t in range(n):
+            x = int(pi_arr[t, S])
+            if x < 0:
+                raise ValueError(f"La política no define acción para el estado {(t, S)}.")
+            if x not in actions_for(t, S):
+                raise ValueError(f"Acción ilegal {x} en el estado {(t, S)}.")
+
+            inv_start[t], orders[t] = S, x
+            S = S + x - demand[t]                 # I_t: inventario final del período t
+            inv_end[t] = S
+
+        return self._report_episode(month_labels, inv_start, orders, inv_end)
+
+    def dict_policy_to_array(self, policy):
+        """
+        Convierte una política dict[(t, S) -> x] en el arreglo denso int32
+        pi_arr[t, S] (forma (n, capacity+1)) que usa report_from_policy_arr().
+        Los estados sin acción (y los terminales) quedan en −1.
+        """
+        pi_arr = np.full((self.n, self.capacity + 1), -1, dtype=np.int32)
+        if policy:
+            t, S = np.array(list(policy.keys())).T
+            x    = np.fromiter(policy.values(), dtype=np.int64, count=len(policy))
+            keep = t < self.n
+            pi_arr[t[keep], S[keep]] = x[keep]
+        return pi_arr
+
+    def rollout(self, pi_arr):
+        """
+        Simula un episodio completo con la política densa pi_arr[t, S] (ver
+        dict_policy_to_array) sin imprimir ni armar reportes. El estado vive en
+        variables locales y se escribe en el entorno una sola vez al final (no
+        en cada período, como hace step()); la recompensa se suma al final.
+
+        Retorna:
+        --------
+        total_reward : float
+            Recompensa total del episodio, −Σ_t (c_t x_t + h_t I_t).
+        """
+        n, demand   = self.n, self.demand
+        actions_for = self._actions_for
+
+        orders  = np.empty(n, dtype=np.int64)   # acción x_t
+        inv_end = np.empty(n, dtype=np.int64)   # inventario final I_t
+
+        S = self.start_inventory
+        for t in range(n):
+            x = int(pi_arr[t, S])
+            if x not in actions_for(t, S):
+                raise ValueError(f"Acción ilegal {x} en el estado {(t, S)}.")
+            S = S + x - demand[t]
+            orders[t], inv_end[t] = x, S
+
+        self.t, self.S = n, S
+        self._set_episode_reward(orders, inv_end)
+        return self.total_reward
+
+    def _set_episode_reward(self, orders, inv_end):
+        """
+        total_reward = −Σ_t (c_t x_t + h_t I_t) con los costos reales, sumado
+        con math.fsum (sin error de redondeo acumulado); con fixed_point,
+        además total_reward_scaled exacto en milésimas.
+        """
+        costos_prod = (self._c_arr * orders).tolist()
+        costos_inv  = (self._h_arr * inv_end).tolist()
+        self.total_reward = -math.fsum(costos_prod + costos_inv)
+        if self.fixed_point:
+            self.total_reward_scaled = -int(self._c_milli @ orders + self._h_milli @ inv_end)
+        return costos_prod, costos_inv
+
+    def _month_labels(self, month_labels):
+        """
+        Etiquetas de los n períodos: meses abreviados ['ENE','FEB',...] si
+        n ≤ 12, M1..Mn en otro caso; las etiquetas dadas se truncan a n.
+        """
         default_months = ['ENE','FEB','MAR','ABR','MAY','JUN',
                           'JUL','AGO','SEP','OCT','NOV','DIC']
         if month_labels is None:
@@ -294,52 +796,28 @@ class InventoryEnv:
                 raise ValueError("month_labels insuficientes para el horizonte n.")
             month_labels = list(month_labels)[:self.n]
 
-        # ------------------------------------------------------------------
-        # 2. Simular episodio completo según la política
-        # ------------------------------------------------------------------
-        state = self.reset()
-        t, S = state
-
-        ts = []
-        inv_start = []   # inventario al inicio (estado S)
-        orders = []      # acción x_t
-        demands = []     # demanda d_t
-        inv_end = []     # inventario final I_t
+        return month_labels
 
-        while not self.is_terminal((t, S)):
-            ts.append(t)
-            inv_start.append(S)
-
-            if (t, S) not in policy:
-                raise KeyError(f"La política no define acción para el estado {(t, S)}.")
-
-            x = policy[(t, S)]
-            orders.append(x)
-
-            d_t = self.demand[t]
-            demands.append(d_t)
+    def _report_episode(self, month_labels, inv_start, orders, inv_end):
+        """
+        Parte común de report_from_policy() y report_from_policy_arr(): deja el
+        entorno en el estado terminal, calcula las métricas del episodio
+        simulado, las imprime y arma la estructura de salida.
+        """
+        n, demands = self.n, self.demand
+        ts = list(range(n))
 
-            (t, S), reward, _ = self.step(x)
-            inv_end.append(self.S)  # después de step(), self.S == I_t
+        # El entorno queda en el estado terminal, como tras ejecutar step() n veces
+        self.t, self.S = n, int(inv_end[-1]) if n else self.start_inventory
 
         # ------------------------------------------------------------------
         # 3. Calcular costo total (FO) y métricas agregadas
         # ------------------------------------------------------------------
-        # Recalcular explícitamente para claridad
-        costos_prod = []
-        costos_inv= []
-        for k in range(len(ts)):
-            t = ts[k]
-            x_t = orders[k]
-            I_t = inv_end[k]  # inventario final del período t
-            c_t = self.production_costs[t]
-            h_t = self.holding_costs[t]
+        costos_prod, costos_inv = self._set_episode_reward(orders, inv_end)
+        inv_start, orders, inv_end = inv_start.tolist(), orders.tolist(), inv_end.tolist()
 
-            costos_prod.append(c_t * x_t )
-            costos_inv.append(h_t * I_t)
-
-        total_costos_prod = round(sum(costos_prod) , 3)
-        total_costos_inv = round(sum(costos_inv) , 3)
+        total_costos_prod = round(math.fsum(costos_prod), 3)
+        total_costos_inv = round(math.fsum(costos_inv), 3)
         obj_lp = round(total_costos_prod + total_costos_inv, 3)
         produccion = {i+1: orders[i] for i in range(len(ts))}
         inventario = {i+1: inv_start[i] for i in range(len(ts))}
@@ -367,3 +845,115 @@ class InventoryEnv:
 
         return obj_lp, costos_prod, costos_inv, produccion, inventario, trayecto
 
+
+
+# =============================================================================
+# NÚCLEOS DE INDUCCIÓN HACIA ATRÁS (ver InventoryEnv.solve_dp)
+# =============================================================================
+def _inv_backward(R_t, Snext_t, valid_t, gamma):
+    """
+    V[t, S] = max_j { R_t[t,S,j] + γ·V[t+1, Snext_t[t,S,j]] } sobre celdas
+    válidas, para t = n−1 … 0. Devuelve V (n+1, capacity+1) y la columna
+    óptima pi (n+1, capacity+1); en terminales V = 0.
+    """
+    T1, W, A = R_t.shape
+    V  = np.zeros((T1, W))
+    pi = np.zeros((T1, W), dtype=np.int64)
+    for t in range(T1 - 2, -1, -1):
+        for S in prange(W):
+            best, arg = -np.inf, 0
+            for j in range(A):
+                if valid_t[t, S, j]:
+                    q = R_t[t, S, j] + gamma * V[t + 1, Snext_t[t, S, j]]
+                    if q > best:
+                        best, arg = q, j
+            V[t, S]  = best
+            pi[t, S] = arg
+    return V, pi
+
+
+def _inv_backward_np(R_t, Snext_t, valid_t, gamma):
+    """
+    Versión NumPy de `_inv_backward`: una expresión vectorizada por etapa.
+    """
+    T1, W, _ = R_t.shape
+    V  = np.zeros((T1, W))
+    pi = np.zeros((T1, W), dtype=np.int64)
+    for t in range(T1 - 2, -1, -1):
+        Q     = np.where(valid_t[t], R_t[t] + gamma * V[t + 1][Snext_t[t]], -np.inf)
+        pi[t] = Q.argmax(axis=1)
+        V[t]  = Q.max(axis=1)
+    return V, pi
+
+
+if njit is not None:
+    _inv_backward = njit(cache=True, parallel=True)(_inv_backward)
+
+
+def _specialized_source(demand, production_costs, holding_costs, capacity):
+    """
+    Código fuente de `solve(gamma)` para una instancia concreta (ver
+    InventoryEnv.compile_solver): un bloque por período, de t = n−1 a 0, con
+    d_t, c_t, h_t y la capacidad como literales. Misma recurrencia y mismo
+    desempate (primer pedido) que _inv_backward.
+    """
+    n, cap = len(demand), int(capacity)
+    lines = [
+        "def solve(gamma):",
+        f"    V = np.zeros(({n + 1}, {cap + 1}))",
+        f"    x_opt = np.full(({n + 1}, {cap + 1}), -1, dtype=np.int64)",
+    ]
+    for t in range(n - 1, -1, -1):
+        d, c, h = int(demand[t]), float(production_costs[t]), float(holding_costs[t])
+        lines += [
+            f"    # t = {t}",
+            f"    for S in range({cap + 1}):",
+            f"        best, arg = -np.inf, -1",
+            f"        for x in range(max(0, {d} - S), {cap + 1} - S):",
+            f"            I = S + x - {d}",
+            f"            q = -({c!r} * x + {h!r} * I) + gamma * V[{t + 1}, I]",
+            f"            if q > best:",
+            f"                best, arg = q, x",
+            f"        V[{t}, S] = best",
+            f"        x_opt[{t}, S] = arg",
+        ]
+    lines.append("    return V, x_opt")
+    return "\n".join(lines) + "\n"
+
+
+_JAX_KERNELS = None
+
+
+def _jax_kernels():
+    """
+    Construye (una sola vez) las funciones jit de JAX: la etapa de Bellman y
+    la inducción hacia atrás completa con lax.scan. `jax` se importa aquí
+    para que sea una dependencia opcional.
+    """
+    global _JAX_KERNELS
+    if _JAX_KERNELS is not None:
+        return _JAX_KERNELS
+
+    try:
+        import jax
+        import jax.numpy as jnp
+    except ImportError:
+        raise ImportError("bellman_jax / solve_jax requieren `jax` (pip install jax).") from None
+
+    @jax.jit
+    def stage(V_next, R, Snext, valid, gamma):
+        Q = jnp.where(valid, R + gamma * V_next[Snext], -jnp.inf)
+        return Q.max(axis=1), Q.argmax(axis=1)
+
+    @jax.jit
+    def backward(R_t, Snext_t, valid_t, gamma):
+        def body(V_next, tablas):
+            V_t, pi_t = stage(V_next, *tablas, gamma)
+            return V_t, (V_t, pi_t)
+
+        V_T = jnp.zeros(R_t.shape[1])            # etapa terminal: V = 0
+        _, (V, pi) = jax.lax.scan(body, V_T, (R_t, Snext_t, valid_t), reverse=True)
+        return V, pi
+
+    _JAX_KERNELS = (stage, backward)
+    return _JAX_KERNELS
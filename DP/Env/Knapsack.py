@@ -1,3 +1,14 @@
+import numpy as np
+
+from state_grid import StateGrid
+
+# Conjuntos de acciones posibles: tuplas inmutables compartidas por todos los
+# estados (actions() no construye una lista nueva en cada llamada)
+_NO_ACTIONS = ()
+_SKIP       = ("skip",)
+_SKIP_TAKE  = ("skip", "take")
+
+
 class KnapsackEnv:
     """
     ============================================================================
@@ -46,14 +57,30 @@ class KnapsackEnv:
         self.capacity = int(capacity)             # Capacidad máxima disponible
         self.n        = len(weights)              # Número total de objetos
 
+        # Copias vectoriales contiguas (SoA) para los resolvedores sobre arreglos
+        # (solve_dp): pesos enteros, porque la capacidad restante c es entera
+        # (el menor de int16/int32/int64 en que caben); valores float64, pues
+        # pueden no ser enteros. Las listas originales se conservan: en el
+        # camino escalar (sim_step) indexar una lista es más barato que
+        # extraer un escalar de NumPy
+        w_raw = np.asarray(self.weights)
+        if not np.array_equal(w_raw, np.round(w_raw)):
+            raise ValueError("Los pesos deben ser enteros: la capacidad restante es entera.")
+        if np.abs(w_raw).max(initial=0) >= 2**63:
+            raise ValueError("Pesos fuera del rango de int64.")
+        w     = w_raw.astype(np.int64)
+        w_max = np.abs(w).max(initial=0)
+        w_type = next(tp for tp in (np.int16, np.int32, np.int64) if w_max <= np.iinfo(tp).max)
+        self.w = np.ascontiguousarray(w.astype(w_type))
+        self.v = np.ascontiguousarray(self.values, dtype=np.float64)
+
         # --- 1.2 Estado actual (se actualiza con reset() o step())
         self.i = None                             # Índice del objeto actual (0 … n)
         self.c = None                             # Capacidad restante
         self.total_reward = None                  # Suma de recompensas acumuladas
 
-        # --- 1.3 Espacio de estados (pares válidos (i, c))
-        self._states = [(i, c) for i in range(self.n + 1)
-                             for c in range(self.capacity + 1)]
+        # --- 1.3 Espacio de estados (pares válidos (i, c)), generado bajo demanda
+        self._states = StateGrid.shared(self.n, self.capacity)
 
     @property
     def state(self):
@@ -85,7 +112,7 @@ class KnapsackEnv:
 
         Retorna:
         --------
-        List[str] con acciones legales ("skip", "take")
+        Tuple[str] con acciones legales ("skip", "take")
         """
         if state is None:
             state = self.state
@@ -94,16 +121,10 @@ class KnapsackEnv:
 
         # --- Si ya no hay objetos por considerar, no hay acciones posibles
         if i >= self.n:
-            return []
-
-        # Siempre se puede omitir el objeto
-        acts = ["skip"]
-
-        # Solo se puede tomar si cabe dentro del presupuesto
-        if self.weights[i] <= c:
-            acts.append("take")
+            return _NO_ACTIONS
 
-        return acts
+        # Siempre se puede omitir el objeto; tomarlo solo si cabe en el presupuesto
+        return _SKIP_TAKE if self.weights[i] <= c else _SKIP
 
     def step(self, action):
         """
@@ -163,6 +184,16 @@ class KnapsackEnv:
         next_state : tupla (i+1, c’)
         reward : float
         """
+        if action not in self.actions(state):     # "take" solo si el objeto cabe
+            raise ValueError(f"Acción ilegal {action!r} en el estado {state}")
+
+        return self._sim_step_unchecked(state, action)
+
+    def _sim_step_unchecked(self, state, action):
+        """
+        sim_step() sin validar la acción. Solo para quien ya garantiza que
+        `action` es legal en `state`, p. ej. al recorrer `actions(state)`.
+        """
         i, c = state
 
         if action == "take":
@@ -207,16 +238,54 @@ class KnapsackEnv:
             state = self.state
         return state[0] >= self.n
 
+    def solve_dp(self):
+        """
+        Resuelve la mochila por inducción hacia atrás sobre la rejilla (i, c):
+
+            V[i, c] = max( V[i+1, c],  v_i + V[i+1, c − w_i]  si w_i ≤ c )
+
+        Cada objeto es una expresión vectorial sobre todas las capacidades
+        c = 0 … W, en lugar de llamar sim_step() por cada par (estado, acción).
+
+        Retorna:
+        --------
+        policy : dict[(i, c) -> "take" | "skip"]
+            Política óptima ("skip" en caso de empate, como value_iteration).
+        V : dict[(i, c) -> float]
+            Valor óptimo de cada estado.
+        """
+        c_all = np.arange(self.capacity + 1)
+        V     = np.zeros((self.n + 1, self.capacity + 1))
+        take  = np.zeros((self.n, self.capacity + 1), dtype=bool)
+
+        for i in range(self.n - 1, -1, -1):
+            fits    = c_all >= self.w[i]
+            q_take  = np.where(fits, self.v[i] + V[i + 1, np.maximum(c_all - self.w[i], 0)], -np.inf)
+            take[i] = q_take > V[i + 1]
+            V[i]    = np.maximum(V[i + 1], q_take)
+
+        policy = {(i, c): ("take" if take[i, c] else "skip")
+                  for i in range(self.n) for c in range(self.capacity + 1)}
+
+        return policy, dict(zip(self._states, V.ravel().tolist()))
+
     def state_space(self):
         """
         Devuelve todos los estados posibles (i, c) del entorno.
 
         Retorna:
         --------
-        List[tuple]
+        StateGrid — secuencia de tuplas (i, c) sin materializar
         """
         return self._states
 
+    def state_array(self):
+        """
+        Estados como arreglo int32 de forma (|S|, 2), columnas (i, c), en el
+        orden de state_space(). Se calcula una vez y queda en caché.
+        """
+        return self._states.state_array()
+
     def report_from_policy(self, policy):
         """
         Ejecuta un episodio completo usando una política dada
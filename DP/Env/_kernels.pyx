@@ -0,0 +1,19 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Núcleos escalares de los entornos, compilados con Cython.
+
+Alternativa AOT a la aritmética de `InventoryEnv._cost` cuando se simulan
+millones de transiciones desde Python. Compilar una vez desde DP/Env/ con:
+
+    cythonize -i _kernels.pyx
+"""
+
+
+cpdef tuple inv_step(long S, long x, long d, double c, double h):
+    """
+    Un período de inventario: devuelve (I_t, costo) con
+        I_t   = S + x − d
+        costo = c·x + h·I_t
+    """
+    cdef long I_t = S + x - d
+    return I_t, c * x + h * I_t
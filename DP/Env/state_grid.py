@@ -0,0 +1,92 @@
+from itertools import product
+from weakref import WeakValueDictionary
+
+import numpy as np
+
+
+class StateGrid:
+    """
+    ============================================================================
+    Espacio de estados rectangular {0 … n} × {0 … capacity}  (sin tuplas)
+    ─────────────────────────────────────────────────────────────────────────────
+    Lo comparten InventoryEnv (estados (t, S)) y KnapsackEnv (estados (i, c)).
+    En lugar de guardar una lista con (n+1)·(capacity+1) tuplas, genera los
+    estados bajo demanda en el mismo orden que la lista original:
+
+        índice k = a·(capacity+1) + b   ⟷   estado (a, b)
+
+    Se comporta como una secuencia de solo lectura:
+        len(grid), iter(grid), grid[k], (a, b) in grid, grid.index((a, b))
+
+    Para los resolvedores vectoriales, `state_array()` devuelve (una sola vez,
+    en caché) el arreglo int32 de forma (|S|, 2) con una fila por estado.
+
+    `StateGrid.shared(n, capacity)` reutiliza la misma rejilla (y su arreglo
+    en caché) entre todos los entornos vivos con igual forma.
+    ============================================================================
+    """
+
+    # Rejillas vivas por (n, capacity); se liberan cuando ningún entorno las usa
+    _shared = WeakValueDictionary()
+
+    def __init__(self, n, capacity):
+        """
+        Parámetros:
+        -----------
+        n        : última etapa (la primera coordenada va de 0 a n)
+        capacity : máximo de la segunda coordenada (0 … capacity)
+        """
+        self.n        = int(n)
+        self.capacity = int(capacity)
+        self._width   = self.capacity + 1
+        self._array   = None
+
+    @classmethod
+    def shared(cls, n, capacity):
+        """
+        Rejilla (n, capacity) compartida: devuelve la existente si algún
+        entorno ya la creó, o una nueva que queda registrada.
+        """
+        key  = (int(n), int(capacity))
+        grid = cls._shared.get(key)
+        if grid is None:
+            grid = cls._shared[key] = cls(*key)
+        return grid
+
+    def __len__(self):
+        return (self.n + 1) * self._width
+
+    def __iter__(self):
+        return product(range(self.n + 1), range(self._width))
+
+    def __getitem__(self, k):
+        k = int(k)
+        if not 0 <= k < len(self):
+            raise IndexError(f"Índice de estado fuera de rango: {k}.")
+        return divmod(k, self._width)
+
+    def __contains__(self, state):
+        a, b = state
+        return 0 <= a <= self.n and 0 <= b <= self.capacity
+
+    def __repr__(self):
+        return f"StateGrid(n = {self.n}, capacity = {self.capacity}, #_Estados = {len(self)})"
+
+    def index(self, state):
+        """
+        Posición del estado (a, b) en el orden de iteración.
+        """
+        if state not in self:
+            raise ValueError(f"{state} no pertenece al espacio de estados.")
+        a, b = state
+        return a * self._width + b
+
+    def state_array(self):
+        """
+        Arreglo int32 (|S|, 2), de solo lectura, con los estados en el orden
+        de iteración. Se construye la primera vez que se pide y luego se reutiliza.
+        """
+        if self._array is None:
+            self._array = np.mgrid[0:self.n + 1, 0:self._width].reshape(2, -1).T.astype(np.int32)
+            self._array.flags.writeable = False   # compartido entre entornos
+        return self._array
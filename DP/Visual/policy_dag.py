@@ -1,7 +1,13 @@
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
 
-def draw_policy_dag(env, policy, initial_state, *, pastel=True, node_size=350):
+def draw_policy_dag(env, policy, initial_state, *, pastel=True, node_size=350,
+                    save_to=None, show=True, max_labels=1000, ax=None,
+                    dag_mode="full"):
     """
     ============================================================================
     Visualización del DAG de estados inducido por una política dada
@@ -20,6 +26,29 @@ def draw_policy_dag(env, policy, initial_state, *, pastel=True, node_size=350):
                            si True, usa colores suaves (por defecto)
       • node_size     : int
                            tamaño de los nodos en el grafo
+      • save_to       : str o Path, opcional
+                           si se indica, guarda la figura en ese archivo
+                           (formato según la extensión) en lugar de mostrarla
+      • show          : bool
+                           si True (por defecto) y no hay `save_to`, llama
+                           plt.show(); con False la figura queda abierta para
+                           seguir editándola (plt.gcf())
+      • max_labels    : int o None
+                           máximo de nodos para rotularlos; con más nodos se
+                           omiten las etiquetas (ilegibles a ese tamaño y
+                           costosas de dibujar). None → sin límite
+      • ax            : matplotlib.axes.Axes, opcional
+                           ejes donde dibujar (se limpian antes); sin `ax` se
+                           crea una figura nueva. Con `ax` no se llama
+                           plt.show() (útil al redibujar en un bucle)
+      • dag_mode      : {"full", "reachable", "policy_only"}
+                           qué transiciones se incluyen en el grafo:
+                           ▸ "full"        → todo el espacio de estados (defecto)
+                           ▸ "reachable"   → solo estados alcanzables desde
+                                             `initial_state` con alguna acción
+                           ▸ "policy_only" → solo la trayectoria de la política;
+                                             no recorre state_space() (el más
+                                             rápido en espacios grandes)
 
     Resultado
       • Visualización gráfica del DAG con:
@@ -29,26 +58,63 @@ def draw_policy_dag(env, policy, initial_state, *, pastel=True, node_size=350):
     """
 
     # -------------------------------------------------------------------------
-    # 1. CONSTRUCCIÓN DEL GRAFO COMPLETO DE ESTADOS Y TRANSICIONES
+    # 1. CONSTRUCCIÓN DEL GRAFO DE ESTADOS Y TRANSICIONES
     # -------------------------------------------------------------------------
+    # ▸ sim_step / is_terminal memorizados durante esta llamada: la trayectoria
+    #   de la sección 2 reutiliza las transiciones ya simuladas aquí
+    if dag_mode not in ("full", "reachable", "policy_only"):
+        raise ValueError(f"dag_mode desconocido: {dag_mode!r}.")
+
+    sim_step    = lru_cache(maxsize=None)(env.sim_step)
+    is_terminal = lru_cache(maxsize=None)(env.is_terminal)
+
+    # ▸ Estados de origen ("full" / "reachable"): todo el espacio o solo los
+    #   alcanzables desde initial_state (recorrido en profundidad)
+    def reachable(start):
+        seen, stack = {start}, [start]
+        while stack:
+            s = stack.pop()
+            yield s
+            if is_terminal(s):
+                continue
+            for a in env.actions(s):
+                ns, _ = sim_step(s, a)
+                if ns not in seen:
+                    seen.add(ns)
+                    stack.append(ns)
+
+    # ▸ Se acumulan las aristas y se insertan de una vez (add_edges_from)
+    edges = []
+    if dag_mode == "policy_only":
+        # Solo las aristas que recorre la política desde initial_state
+        s = initial_state
+        while not is_terminal(s) and policy.get(s) is not None:
+            a = policy[s]
+            ns, r = sim_step(s, a)
+            edges.append((s, ns, {"action": a, "reward": r}))
+            s = ns
+    else:
+        sources = reachable(initial_state) if dag_mode == "reachable" else env.state_space()
+        for s in sources:
+            if is_terminal(s):
+                continue
+            for a in env.actions(s):
+                ns, r = sim_step(s, a)
+                edges.append((s, ns, {"action": a, "reward": r}))
+
     G = nx.DiGraph()
-    for s in env.state_space():
-        if env.is_terminal(s):
-            continue
-        for a in env.actions(s):
-            ns, r = env.sim_step(s, a)
-            G.add_edge(s, ns, action=a, reward=r)
+    G.add_edges_from(edges)
 
     # -------------------------------------------------------------------------
     # 2. TRAZAR LA TRAYECTORIA INDUCIDA POR LA POLÍTICA
     # -------------------------------------------------------------------------
     optimal_edges = []
     state = initial_state
-    while not env.is_terminal(state):
+    while not is_terminal(state):
         a = policy.get(state)
         if a is None:
             break  # Política incompleta o estado huérfano
-        ns, _ = env.sim_step(state, a)
+        ns, _ = sim_step(state, a)
         optimal_edges.append((state, ns))
         state = ns
 
@@ -61,10 +127,18 @@ def draw_policy_dag(env, policy, initial_state, *, pastel=True, node_size=350):
 
     dim0_vals = sorted(set(s[0] for s in states))  # dimensión índice de ítem
     dim1_vals = sorted(set(s[1] for s in states))  # dimensión capacidad restante
+    d0 = {v: i for i, v in enumerate(dim0_vals)}   # valor → columna (sin .index)
+    d1 = {v: i for i, v in enumerate(dim1_vals)}   # valor → fila
+    ymax = len(dim1_vals) - 1
     dx, dy = 1.6, 1.0
-    pos = {s: (dim0_vals.index(s[0]) * dx,
-               len(dim1_vals) - 1 - dim1_vals.index(s[1]) * dy)
-           for s in states}
+
+    # ▸ Posiciones como arreglo (N, 2) en el orden de G.nodes; `pos` (dict) es
+    #   solo la vista que piden las funciones de networkx
+    state_to_idx = {s: i for i, s in enumerate(states)}
+    col = np.fromiter((d0[s[0]] for s in states), dtype=float, count=len(states))
+    row = np.fromiter((d1[s[1]] for s in states), dtype=float, count=len(states))
+    pos_arr = np.column_stack([col * dx, (ymax - row) * dy])
+    pos = dict(zip(states, pos_arr.tolist()))
 
     # -------------------------------------------------------------------------
     # 4. DEFINIR COLORES SEGÚN ACCIÓN TOMADA EN LA POLÍTICA
@@ -78,38 +152,65 @@ def draw_policy_dag(env, policy, initial_state, *, pastel=True, node_size=350):
     # ▸ Asignar acción tomada desde cada nodo (si está en la trayectoria óptima)
     decision_at = {u: G.edges[(u, v)]["action"] for u, v in optimal_edges}
 
+    # ▸ Tabla fija acción (texto) → color, con los sinónimos conocidos
+    str_colors = dict.fromkeys(["take", "order", "comprar"], colors["primary"])
+    str_colors.update(dict.fromkeys(["skip", "omitir", "esperar"], colors["alt"]))
+
     # ▸ Función auxiliar para asignar color según tipo de acción
     def color_for_action(a):
         if isinstance(a, str):
-            if a.lower() in ["take", "order", "comprar"]:
-                return colors["primary"]
-            elif a.lower() in ["skip", "omitir", "esperar"]:
-                return colors["alt"]
-        elif isinstance(a, int):
+            return str_colors.get(a.lower(), colors["other"])
+        if isinstance(a, int):
             return colors["primary"] if a > 0 else colors["alt"]
         return colors["other"]
 
-    node_colors = [
-        color_for_action(decision_at.get(n)) if n in decision_at else colors["other"]
-        for n in G.nodes
-    ]
+    # ▸ Solo los nodos de la trayectoria tienen acción; el resto, color neutro
+    color_at    = {u: color_for_action(a) for u, a in decision_at.items()}
+    node_colors = [color_at.get(n, colors["other"]) for n in G.nodes]
 
     # -------------------------------------------------------------------------
-    # 5. DESTACAR LA POLÍTICA COMO ARISTAS DE MAYOR PESO
+    # 5. SEGMENTOS DE LAS ARISTAS: las de la política se destacan aparte
     # -------------------------------------------------------------------------
-    edge_widths = [3 if e in optimal_edges else 1 for e in G.edges]
+    #   Segmentos (E, 2, 2) tomados de pos_arr con los índices de cada extremo
+    opt_set = set(optimal_edges)
+    thin    = [(state_to_idx[u], state_to_idx[v]) for u, v in G.edges if (u, v) not in opt_set]
+    thin_segments = pos_arr[np.array(thin, dtype=np.intp).reshape(-1, 2)]
 
     # -------------------------------------------------------------------------
     # 6. DIBUJAR EL GRAFO FINAL
+    #    ▸ Aristas delgadas: una sola LineCollection (un artista para todas,
+    #      sin flechas: el DAG avanza siempre de izquierda a derecha)
+    #    ▸ Aristas de la política: flechas gruesas, una por paso de la trayectoria
     # -------------------------------------------------------------------------
-    plt.subplots(figsize=(20, 16))
-    nx.draw_networkx_nodes(G, pos,
+    standalone = ax is None            # ¿figura propia o ejes del usuario?
+    if standalone:
+        fig, ax = plt.subplots(figsize=(20, 16), layout="constrained")
+    else:
+        fig = ax.figure
+        ax.clear()
+    ax.add_collection(LineCollection(thin_segments, linewidths=1, colors="black", zorder=1))
+
+    node_radius = node_size ** 0.5 / 2   # radio del nodo en puntos
+    for u, v in optimal_edges:
+        ax.annotate("", xy=pos[v], xytext=pos[u], zorder=3,
+                    arrowprops=dict(arrowstyle="-|>", lw=3, color="black",
+                                    shrinkA=node_radius, shrinkB=node_radius))
+
+    nx.draw_networkx_nodes(G, pos, ax=ax,
                            node_color=node_colors,
                            node_size=node_size,
                            edgecolors="black", linewidths=0.4)
-    nx.draw_networkx_edges(G, pos, width=edge_widths, arrows=True)
-    nx.draw_networkx_labels(G, pos, font_size=6)
-    plt.title("DAG de estados con trayectoria según la política")
-    plt.axis("off")
-    plt.tight_layout()
-    plt.show()
+    if max_labels is None or G.number_of_nodes() <= max_labels:
+        nx.draw_networkx_labels(G, pos, ax=ax, font_size=6)
+    ax.autoscale_view()
+    ax.set_title("DAG de estados con trayectoria según la política")
+    ax.axis("off")
+    # Guardar (y liberar la figura propia, útil en lote) o mostrar; con `ax`
+    # del usuario no se muestra: la figura es suya. El diseño lo resuelve el
+    # motor "constrained" al dibujar (sin una pasada extra de tight_layout)
+    if save_to is not None:
+        fig.savefig(save_to)
+        if standalone:
+            plt.close(fig)
+    elif show and standalone:
+        plt.show()
@@ -1,10 +1,13 @@
+from functools import lru_cache
+
 import numpy as np
 import matplotlib.pyplot as plt
 
 
 def value_states_visual(env, V, policy=None, trajectory=None,
                         annotate=True, cmap="YlGn",
-                        marker_size=1500, line_width=2.0, line_style=':'):
+                        marker_size=1500, line_width=2.0, line_style=':',
+                        max_annotations=1000, save_to=None, show=True, ax=None):
     """
     ============================================================================
     Visualización: Mapa de calor de la función de valor V(s) + trayectoria
@@ -59,6 +62,19 @@ def value_states_visual(env, V, policy=None, trajectory=None,
         Grosor de la línea de trayectoria.
     line_style : str, por defecto ':'
         Estilo de la línea (p.ej. '-', '--', ':').
+    max_annotations : int o None, por defecto 1000
+        Máximo de celdas a anotar: si hay más celdas con valor, se omiten las
+        anotaciones (serían ilegibles y cada una es un artista de matplotlib
+        que se dibuja por separado). None → sin límite.
+    save_to : str o Path, opcional
+        Si se indica, guarda la figura en ese archivo en lugar de mostrarla.
+    show : bool, por defecto True
+        Si True y no hay `save_to`, llama plt.show(). Con False la figura
+        queda abierta (plt.gcf()) para seguir editándola.
+    ax : matplotlib.axes.Axes, opcional
+        Ejes donde dibujar (se limpian antes). Sin `ax` se crea una figura
+        nueva. Con `ax` no se crea figura, no se llama plt.show() ni se añade
+        barra de color (p.ej. para redibujar los mismos ejes en un bucle).
 
     Comportamiento respecto a política
     ----------------------------------
@@ -105,7 +121,8 @@ def value_states_visual(env, V, policy=None, trajectory=None,
     # -------------------------------------------------------------------------
     # 0. Estados no terminales
     # -------------------------------------------------------------------------
-    all_states = [s for s in env.state_space() if not env.is_terminal(s)]
+    is_terminal = lru_cache(maxsize=None)(env.is_terminal)   # memorizado en esta llamada
+    all_states  = [s for s in env.state_space() if not is_terminal(s)]
     if not all_states:
         raise ValueError("No hay estados no terminales en el entorno.")
 
@@ -114,19 +131,22 @@ def value_states_visual(env, V, policy=None, trajectory=None,
         raise ValueError("La visualización solo admite estados con dos dimensiones.")
 
     # -------------------------------------------------------------------------
-    # 1. Rejilla
+    # 1. Rejilla: estados como arreglo (N, 2); valores de cada eje con np.unique
+    #    y posición de cada estado en la rejilla con np.searchsorted
     # -------------------------------------------------------------------------
-    eje_y_vals = sorted(set(s[0] for s in all_states))   # filas
-    eje_x_vals = sorted(set(s[1] for s in all_states))   # columnas
+    states_arr = np.asarray(all_states)
+    eje_y_vals = np.unique(states_arr[:, 0])   # filas
+    eje_x_vals = np.unique(states_arr[:, 1])   # columnas
+    ys_idx = np.searchsorted(eje_y_vals, states_arr[:, 0])
+    xs_idx = np.searchsorted(eje_x_vals, states_arr[:, 1])
+    eje_y_vals, eje_x_vals = eje_y_vals.tolist(), eje_x_vals.tolist()
 
     y_map = {val: i for i, val in enumerate(eje_y_vals)}
     x_map = {val: i for i, val in enumerate(eje_x_vals)}
 
+    # V(s) de cada estado (NaN si falta), asignado de una vez
     value_matrix = np.full((len(eje_y_vals), len(eje_x_vals)), np.nan)
-    for s in all_states:
-        if s in V:
-            y, x = s
-            value_matrix[y_map[y], x_map[x]] = V[s]
+    value_matrix[ys_idx, xs_idx] = [V.get(s, np.nan) for s in all_states]
 
     # -------------------------------------------------------------------------
     # 2. Trayectoria
@@ -152,7 +172,7 @@ def value_states_visual(env, V, policy=None, trajectory=None,
                 return policy[alt]
             raise KeyError(f"La política no define acción para el estado {st}.")
 
-        while not env.is_terminal(s):
+        while not is_terminal(s):
             a = _get_action(s)
             s, _ = env.sim_step(s, a)
             path.append(s)
@@ -162,16 +182,25 @@ def value_states_visual(env, V, policy=None, trajectory=None,
     # -------------------------------------------------------------------------
     # 3. Heatmap
     # -------------------------------------------------------------------------
-    fig, ax = plt.subplots(figsize=(20, 16))
-    cax = ax.imshow(value_matrix, cmap=cmap, origin="upper", aspect="auto")
+    standalone = ax is None            # ¿figura propia o ejes del usuario?
+    if standalone:
+        fig, ax = plt.subplots(figsize=(20, 16), layout="constrained")
+    else:
+        fig = ax.figure
+        ax.clear()
+    # Imagen en float32 (la mitad de bytes al remuestrear) y sin interpolar:
+    # cada celda es un estado; las anotaciones usan la matriz float64 original
+    cax = ax.imshow(value_matrix.astype(np.float32), cmap=cmap, origin="upper",
+                    aspect="auto", interpolation="nearest")
 
     if annotate:
-        for yy in range(len(eje_y_vals)):
-            for xx in range(len(eje_x_vals)):
-                val = value_matrix[yy, xx]
-                if not np.isnan(val):
-                    ax.text(xx, yy, f"{val:.1f}", ha='center', va='center',
-                            color='black', fontsize=9)
+        # Celdas con valor y sus etiquetas, calculadas de una vez
+        ys, xs = np.nonzero(~np.isnan(value_matrix))
+        if max_annotations is None or len(ys) <= max_annotations:
+            labels = [f"{val:.1f}" for val in value_matrix[ys, xs].tolist()]
+            for xx, yy, label in zip(xs.tolist(), ys.tolist(), labels):
+                ax.text(xx, yy, label, ha='center', va='center',
+                        color='black', fontsize=9)
 
     ax.set_title("Mapa de calor de la función de valor $V(s)$")
     ax.set_xlabel("Segundo componente del estado")
@@ -181,7 +210,8 @@ def value_states_visual(env, V, policy=None, trajectory=None,
     ax.set_xticklabels(eje_x_vals)
     ax.set_yticklabels(eje_y_vals)
 
-    fig.colorbar(cax, ax=ax, label="$V(s)$")
+    if standalone:                     # con `ax` reutilizado no se apilan barras
+        fig.colorbar(cax, ax=ax, label="$V(s)$")
 
     # -------------------------------------------------------------------------
     # 4. Superponer trayectoria: círculos rojos huecos + línea punteada
@@ -211,5 +241,12 @@ def value_states_visual(env, V, policy=None, trajectory=None,
                        zorder=5,
                        label='Trayectoria')
 
-    plt.tight_layout()
-    plt.show()
+    # Guardar (y liberar la figura propia, útil en lote) o mostrar; con `ax`
+    # del usuario no se muestra: la figura es suya. El diseño lo resuelve el
+    # motor "constrained" al dibujar (sin una pasada extra de tight_layout)
+    if save_to is not None:
+        fig.savefig(save_to)
+        if standalone:
+            plt.close(fig)
+    elif show and standalone:
+        plt.show()
\ No newline at end of file
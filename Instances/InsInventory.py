@@ -1,7 +1,20 @@
-import random
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 
+try:                      # numba es opcional: compila el generador por lotes
+    from numba import njit, prange
+except ImportError:
+    njit, prange = None, range
+
+# Etiquetas de mes para horizontes de hasta 12 períodos
+_MESES_12 = ('ENE','FEB','MAR','ABR','MAY','JUN','JUL','AGO','SEP','OCT','NOV','DIC')
+
+# Etiqueta por zona de np.digitize frente a los bordes
+# [barato_min, barato_max⁺, caro_min, caro_max⁺] (ver _clasificar)
+_CLASIF_LUT = np.array(['Medio', 'Barato', 'Medio', 'Caro', 'Medio'])
+
 
 # ============================================================================
 # Generador sintético de instancias de planeación de inventarios estacionales
@@ -19,7 +32,10 @@ def generar_datos(num_periodos: int = 12,
                                  prob_mes_barato=0.35,
                                  start_inventory_max=3,
                                  ensure_windows=True,
-                                 seed=None):
+                                 seed=None,
+                                 as_arrays=False,
+                                 low_precision=False,
+                                 return_df=True):
     """
     ============================================================================
     Generador sintético de datos para el problema de inventario multi-período
@@ -56,24 +72,45 @@ def generar_datos(num_periodos: int = 12,
     ensure_windows : bool
         Si True, fuerza al menos un mes caro rodeado por uno o dos meses baratos
         para crear oportunidades de preproducción (útil para pruebas).
-    seed : int or None
-        Semilla para reproducibilidad.
+    seed : int, np.random.Generator or None
+        Semilla para reproducibilidad. Con un entero la instancia sale de un
+        generador MT19937 propio (el mismo flujo que np.random.seed(seed) y que
+        generar_datos_lote) y queda memorizada: repetir semilla y parámetros
+        solo reconstruye el DataFrame. Un Generator (p.ej.
+        np.random.default_rng(s)) se usa tal cual. En ambos casos no se toca
+        el estado global de NumPy; con None se usa el generador global.
+    as_arrays : bool (default=False)
+        Si True, devuelve la tupla de arreglos (ver Salidas) en lugar de solo
+        el DataFrame. Para ciclos de DP ajustados conviene usar estos arreglos.
+    low_precision : bool (default=False)
+        Si True, c_t y h_t se guardan como float32 y d_t como int16 (int32 si
+        alguna demanda no cabe), tanto en el DataFrame como en los arreglos.
+        Los costos ya vienen redondeados a 2 decimales.
+    return_df : bool (default=True)
+        Si False, omite la tabla resumen (sección 7, el paso más costoso para T
+        pequeño) y devuelve la tupla de arreglos con df = None, aunque
+        as_arrays sea False. Útil al generar muchas instancias.
 
     Salidas
     -------
-    c : dict[int -> float]
-        Costos de producción c_t (indexados 1..num_periodos).
-    h : dict[int -> float]
-        Costos de almacenamiento h_t (indexados 1..num_periodos).
-    d : dict[int -> int]
-        Demandas d_t (enteras, indexadas 1..num_periodos).
+    Por defecto (as_arrays=False, return_df=True) solo el DataFrame `df`.
+    Con as_arrays=True o return_df=False, siempre la misma tupla de 5:
+
+        (df, c_arr, h_arr, d_arr, I0)
+
+    df : pd.DataFrame o None
+        Tabla resumen indexada por t = 1..T, con columnas
+            ['t','Mes','c_t','h_t','d_t','Clasif_c','Clasif_h','Demanda_rel'];
+        None si return_df=False.
+    c_arr, h_arr : np.ndarray (T,) float64 (float32 con low_precision)
+        Costos de producción y de almacenamiento; c_arr[j] ↔ período j+1.
+    d_arr : np.ndarray (T,) int64 (int16/int32 con low_precision)
+        Demandas.
     I0 : int
         Inventario inicial (0..start_inventory_max).
-    M : range
-        Conjunto de períodos (range(1, num_periodos+1)).
-    df : pd.DataFrame
-        Tabla resumen con columnas:
-            ['t','Mes','c_t','h_t','d_t','Clasif_c','Clasif_h','Demanda_rel']
+
+    Con semilla entera los arreglos vienen de la caché y son de solo lectura:
+    usar .copy() antes de modificarlos.
 
     Notas
     -----
@@ -87,21 +124,92 @@ def generar_datos(num_periodos: int = 12,
 
     Ejemplo
     -------
-    >>> c, h, d, I0, M, df = generar_instancia_inventario(seed=42)
-    >>> df
+    >>> df = generar_datos(seed=42)
+    >>> _, c_arr, h_arr, d_arr, I0 = generar_datos(seed=42, return_df=False)
     ============================================================================
     """
 
-    if seed is not None:
-        random.seed(seed)
-        np.random.seed(seed)
-
     T = num_periodos
-    M = range(1, T + 1)
+
+    parametros = (tuple(rango_c_barato), tuple(rango_c_medio), tuple(rango_c_caro),
+                  tuple(rango_h_barato), tuple(rango_h_medio), tuple(rango_h_caro),
+                  tuple(demanda_base), demanda_ruido, prob_mes_caro, prob_mes_barato,
+                  start_inventory_max, ensure_windows)
+
+    if isinstance(seed, (int, np.integer)):
+        # Semilla entera: instancia determinista, memorizada en _instancia
+        c_arr, h_arr, d_arr, I0 = _instancia(T, int(seed), *parametros)
+    else:
+        # Generador propio (np.random.Generator, p.ej. PCG64 de default_rng)
+        # o el global de NumPy
+        if isinstance(seed, np.random.Generator):
+            rng = seed
+        else:
+            if seed is not None:
+                np.random.seed(seed)
+            rng = np.random
+
+        # Todas las uniformes U(0,1) de la instancia en un solo llenado del
+        # generador; _muestrear las lleva a costos, demandas e inventario inicial
+        U = rng.random(5 * T + 2)
+        c_arr, h_arr, d_arr, I0 = _muestrear(U, T, *_parametros(*parametros))
+
+    # Sin tabla resumen (barridos de instancias): se omite la sección 7
+    if not return_df:
+        if low_precision:
+            c_arr, h_arr, d_arr = _baja_precision(c_arr, h_arr, d_arr)
+        return None, c_arr, h_arr, d_arr, I0
 
     # ----------------------------------------------------------------------
-    # 1. Clasificaciones iniciales de costo de producción por período
+    # 7. DataFrame resumen con clasificación
     # ----------------------------------------------------------------------
+    
+    # etiquetas mes (ENE..DIC) si T<=12; si >12, usar M1..MT
+    if T <= 12:
+        mes_labels = _MESES_12[:T]
+    else:
+        mes_labels = np.char.add('M', np.arange(1, T + 1).astype(str))
+
+    # Clasificaciones por columna (búsqueda binaria contra los bordes de rango)
+    clasif_c = _clasificar(c_arr, rango_c_barato, rango_c_caro)
+    clasif_h = _clasificar(h_arr, rango_h_barato, rango_h_caro)
+
+    d_med    = np.median(d_arr)
+    clasif_d = np.select([d_arr > d_med, d_arr < d_med], ["Alta", "Baja"], default="Media")
+
+    # Precisión reducida (tras clasificar, que compara contra los rangos en float64)
+    if low_precision:
+        c_arr, h_arr, d_arr = _baja_precision(c_arr, h_arr, d_arr)
+
+    df = pd.DataFrame({
+        "t"          : np.arange(1, T + 1),
+        "Mes"        : mes_labels,
+        "c_t"        : c_arr,
+        "h_t"        : h_arr,
+        "d_t"        : d_arr,
+        "Clasif_c"   : clasif_c,
+        "Clasif_h"   : clasif_h,
+        "Demanda_rel": clasif_d,
+    })
+    df.set_index(df['t'], inplace=True)
+
+    if as_arrays:
+        return df, c_arr, h_arr, d_arr, I0
+    return df
+
+
+# ============================================================================
+# Núcleo numérico del generador (compartido con generar_datos_lote)
+# ============================================================================
+def _parametros(rango_c_barato, rango_c_medio, rango_c_caro,
+                rango_h_barato, rango_h_medio, rango_h_caro,
+                demanda_base, demanda_ruido, prob_mes_caro, prob_mes_barato,
+                start_inventory_max, ensure_windows):
+    """
+    Traduce los parámetros de generar_datos a los argumentos de _muestrear:
+    acumulada de probabilidades de categoría y límites (min, max) por
+    categoría 0=barato, 1=medio, 2=caro.
+    """
     # Convert probabilities to weights that sum to 1
     p_caro = prob_mes_caro
     p_barato = prob_mes_barato
@@ -109,19 +217,74 @@ def generar_datos(num_periodos: int = 12,
     weights = np.array([p_barato, p_medio, p_caro])
     weights = weights / weights.sum()
 
+    lo_c = np.array([rango_c_barato[0], rango_c_medio[0], rango_c_caro[0]], dtype=float)
+    hi_c = np.array([rango_c_barato[1], rango_c_medio[1], rango_c_caro[1]], dtype=float)
+    lo_h = np.array([rango_h_barato[0], rango_h_medio[0], rango_h_caro[0]], dtype=float)
+    hi_h = np.array([rango_h_barato[1], rango_h_medio[1], rango_h_caro[1]], dtype=float)
+
+    d_low, d_high = demanda_base
+    return (np.cumsum(weights), lo_c, hi_c, lo_h, hi_h, int(d_low), int(d_high),
+            int(demanda_ruido), int(start_inventory_max), bool(ensure_windows))
+
+
+def _clasificar(x, rango_barato, rango_caro):
+    """
+    'Barato' si x ∈ [rango_barato], 'Caro' si x ∈ [rango_caro] y 'Medio' en
+    otro caso (intervalos cerrados; si se solapan, gana 'Barato').
+
+    Con rangos ordenados (barato por debajo de caro) es un np.digitize contra
+    cuatro bordes y una lectura de _CLASIF_LUT; el borde superior de cada rango
+    se corre al siguiente flotante para que el intervalo quede cerrado.
+    """
+    bordes = np.array([rango_barato[0], np.nextafter(rango_barato[1], np.inf),
+                       rango_caro[0],   np.nextafter(rango_caro[1], np.inf)], dtype=float)
+    if (np.diff(bordes) >= 0).all():
+        return _CLASIF_LUT[np.digitize(x, bordes)]
+    return np.select([(rango_barato[0] <= x) & (x <= rango_barato[1]),
+                      (rango_caro[0]   <= x) & (x <= rango_caro[1])],
+                     ["Barato", "Caro"], default="Medio")
+
+
+def _baja_precision(c_arr, h_arr, d_arr):
+    """
+    Costos en float32 y demandas en int16 (int32 si alguna no cabe).
+    """
+    d_type = np.int16 if d_arr.max(initial=0) <= np.iinfo(np.int16).max else np.int32
+    return c_arr.astype(np.float32), h_arr.astype(np.float32), d_arr.astype(d_type)
+
+
+def _muestrear(U, T, cum_w, lo_c, hi_c, lo_h, hi_h, d_low, d_high,
+               demanda_ruido, start_inventory_max, ensure_windows):
+    """
+    Lleva las 5·T + 2 uniformes U de una instancia a (c_arr, h_arr, d_arr, I0).
+    Solo usa operaciones que numba también compila: generar_datos la llama
+    desde Python y generar_datos_lote desde su bucle compilado.
+    """
+    # cada campo usa su fila de uniformes y la lleva a su rango con a + (b−a)·U
+    U5 = U[:5 * T].reshape(5, T)
+    U_cat, U_c, U_h, U_d, U_ruido = U5[0], U5[1], U5[2], U5[3], U5[4]
+    u_ventana, u_I0 = U[5 * T], U[5 * T + 1]
+
+    # ----------------------------------------------------------------------
+    # 1. Clasificaciones iniciales de costo de producción por período
+    # ----------------------------------------------------------------------
     # Sample category for each period: 0=barato,1=medio,2=caro
-    cat_c = np.random.choice([0,1,2], size=T, p=weights)
+    # (inversa de la acumulada: U < F(0) → 0, U < F(1) → 1, resto → 2)
+    cat_c = np.minimum(np.searchsorted(cum_w, U_cat, side='right'), 2)
 
     # ----------------------------------------------------------------------
     # 2. ensure_windows: forzar al menos un pico caro con vecinos baratos
     # ----------------------------------------------------------------------
     if ensure_windows:
         # elegir un índice para "mes caro" si no existe uno ya
-        if 2 not in cat_c:
-            idx = np.random.randint(T)
+        es_caro = (cat_c == 2)
+        if not es_caro.any():
+            idx = int(u_ventana * T)
             cat_c[idx] = 2
+            es_caro[idx] = True
         # elige algunos vecinos a marcar como baratos si están medio
-        idx_caro = int(np.where(cat_c == 2)[0][0])
+        # (argmax sobre la máscara booleana = primer mes caro)
+        idx_caro = int(es_caro.argmax())
         if idx_caro - 1 >= 0 and cat_c[idx_caro - 1] == 1:
             cat_c[idx_caro - 1] = 0
         if idx_caro + 1 < T and cat_c[idx_caro + 1] == 1:
@@ -130,106 +293,127 @@ def generar_datos(num_periodos: int = 12,
     # ----------------------------------------------------------------------
     # 3. Muestrear costos de producción según categoría
     # ----------------------------------------------------------------------
-    c_vals = []
-    for cat in cat_c:
-        if cat == 0:   # barato
-            c_vals.append(round(random.uniform(*rango_c_barato), 2))
-        elif cat == 1: # medio
-            c_vals.append(round(random.uniform(*rango_c_medio), 2))
-        else:          # caro
-            c_vals.append(round(random.uniform(*rango_c_caro), 2))
+    # una sola expresión vectorizada muestrea los T costos
+    c_arr = np.round(lo_c[cat_c] + (hi_c[cat_c] - lo_c[cat_c]) * U_c, 2)
 
     # ----------------------------------------------------------------------
     # 4. Holding: correlacionar con producción (opcional)
     # ----------------------------------------------------------------------
     # Idea: antes de un mes caro de producción, haz el holding más barato
     # para incentivar anticipar producción. Después de mes caro, subir algo.
-    h_vals = []
-    for t in range(T):
-        # por defecto: medio
-        base = round(random.uniform(*rango_h_medio), 2)
-
-        # si el próximo mes es caro en producción → bajar holding actual
-        if t+1 < T and cat_c[t+1] == 2:
-            base = round(random.uniform(*rango_h_barato), 2)
+    cat_h = np.ones(T, dtype=np.int64)     # por defecto: medio
+    cat_h[:-1][cat_c[1:] == 2] = 0         # el próximo mes es caro → holding barato
+    cat_h[cat_c == 2] = 2                  # el mes actual es caro → holding caro
 
-        # si el mes actual es caro en producción → holding un poco caro
-        if cat_c[t] == 2:
-            base = round(random.uniform(*rango_h_caro), 2)
-
-        h_vals.append(base)
+    h_arr = np.round(lo_h[cat_h] + (hi_h[cat_h] - lo_h[cat_h]) * U_h, 2)
 
     # ----------------------------------------------------------------------
     # 5. Demanda: base + ruido
     # ----------------------------------------------------------------------
-    # base uniforme entero
-    d_low, d_high = demanda_base
-    d_vals = np.random.randint(d_low, d_high+1, size=T)
+    # base uniforme entero: a + ⌊U·(b − a + 1)⌋ ∈ {a … b}
+    d_arr = d_low + np.floor(U_d * (d_high - d_low + 1)).astype(np.int64)
 
     if demanda_ruido > 0:
-        ruido = np.random.randint(-demanda_ruido, demanda_ruido+1, size=T)
-        d_vals = np.clip(d_vals + ruido, 0, None)
-
-    d_vals = d_vals.astype(int).tolist()
+        ruido = -demanda_ruido + np.floor(U_ruido * (2 * demanda_ruido + 1)).astype(np.int64)
+        d_arr = np.maximum(d_arr + ruido, 0)
 
     # ----------------------------------------------------------------------
     # 6. Inventario inicial
     # ----------------------------------------------------------------------
-    I0 = random.randint(0, start_inventory_max)
+    I0 = int(u_I0 * (start_inventory_max + 1))
 
-    # ----------------------------------------------------------------------
-    # 7. Empaquetar en dicts 1..T
-    # ----------------------------------------------------------------------
-    c = {t+1: c_vals[t] for t in range(T)}
-    h = {t+1: h_vals[t] for t in range(T)}
-    d = {t+1: d_vals[t] for t in range(T)}
+    return c_arr, h_arr, d_arr, I0
 
-    # ----------------------------------------------------------------------
-    # 8. DataFrame resumen con clasificación
-    # ----------------------------------------------------------------------
-    
-    # etiquetas mes (ENE..DIC) si T<=12; si >12, usar M1..MT
-    meses_12 = ['ENE','FEB','MAR','ABR','MAY','JUN','JUL','AGO','SEP','OCT','NOV','DIC']
 
-    if T <= 12:
-        mes_labels = meses_12[:T]
-    else:
-        mes_labels = [f"M{t+1}" for t in range(T)]
-
-    def clasif_c(val):
-        if rango_c_barato[0] <= val <= rango_c_barato[1]: return "Barato"
-        if rango_c_caro[0]   <= val <= rango_c_caro[1]:   return "Caro"
-        return "Medio"
-
-    def clasif_h(val):
-        if rango_h_barato[0] <= val <= rango_h_barato[1]: return "Barato"
-        if rango_h_caro[0]   <= val <= rango_h_caro[1]:   return "Caro"
-        return "Medio"
-
-    d_arr = np.array(d_vals)
-    d_med = np.median(d_arr)
-    def clasif_d(val):
-        if val > d_med: return "Alta"
-        if val < d_med: return "Baja"
-        return "Media"
-
-    registros = []
-    for t in range(T):
-        registros.append({
-            "t"       : t+1,
-            "Mes"     : mes_labels[t],
-            "c_t"     : c_vals[t],
-            "h_t"     : h_vals[t],
-            "d_t"     : d_vals[t],
-            "Clasif_c": clasif_c(c_vals[t]),
-            "Clasif_h": clasif_h(h_vals[t]),
-            "Demanda_rel": clasif_d(d_vals[t]),
-        })
-
-    df = pd.DataFrame(registros)
-    df.set_index(df['t'], inplace=True)
+@lru_cache(maxsize=256)
+def _instancia(num_periodos, seed, *parametros):
+    """
+    (c_arr, h_arr, d_arr, I0) de la instancia con semilla entera `seed`,
+    memorizada por (num_periodos, seed, parámetros). Muestrea con un
+    RandomState propio, así que no depende ni altera el estado global.
+    Los arreglos quedan de solo lectura porque la caché los comparte.
+    """
+    U = np.random.RandomState(seed).random_sample(5 * num_periodos + 2)
+    c_arr, h_arr, d_arr, I0 = _muestrear(U, num_periodos, *_parametros(*parametros))
+    for arr in (c_arr, h_arr, d_arr):
+        arr.flags.writeable = False
+    return c_arr, h_arr, d_arr, I0
+
+
+def _lote(semillas, T, cum_w, lo_c, hi_c, lo_h, hi_h, d_low, d_high,
+          demanda_ruido, start_inventory_max, ensure_windows):
+    """
+    Una instancia por semilla, cada una en su fila de las matrices (n, T).
+    Compilado con numba, las instancias se reparten entre núcleos (prange);
+    cada hilo tiene su propio generador, sembrado por instancia.
+    """
+    n = semillas.shape[0]
+    C  = np.empty((n, T))
+    H  = np.empty((n, T))
+    D  = np.empty((n, T), dtype=np.int64)
+    I0 = np.empty(n, dtype=np.int64)
+    for k in prange(n):
+        np.random.seed(semillas[k])
+        U = np.random.random(5 * T + 2)
+        c_k, h_k, d_k, I0[k] = _muestrear_jit(U, T, cum_w, lo_c, hi_c, lo_h, hi_h,
+                                              d_low, d_high, demanda_ruido,
+                                              start_inventory_max, ensure_windows)
+        C[k] = c_k
+        H[k] = h_k
+        D[k] = d_k
+    return C, H, D, I0
+
+
+if njit is not None:
+    _muestrear_jit = njit(cache=True)(_muestrear)
+    _lote = njit(cache=True, parallel=True)(_lote)
+else:
+    _muestrear_jit = _muestrear
+
+
+def generar_datos_lote(n_instancias: int,
+                       num_periodos: int = 12,
+                       rango_c_barato=(4, 6),
+                       rango_c_medio=(6, 8),
+                       rango_c_caro=(8, 12),
+                       rango_h_barato=(1, 3),
+                       rango_h_medio=(3, 5),
+                       rango_h_caro=(5, 8),
+                       demanda_base=(4, 6),
+                       demanda_ruido=1,
+                       prob_mes_caro=0.25,
+                       prob_mes_barato=0.35,
+                       start_inventory_max=3,
+                       ensure_windows=True,
+                       seed=0):
+    """
+    ============================================================================
+    Generación por lotes para barridos Monte Carlo
+    ─────────────────────────────────────────────────────────────────────────────
+    Genera `n_instancias` instancias de generar_datos sin construir DataFrames.
+    La instancia k usa la semilla `seed + k` y coincide con
+    generar_datos(seed=seed + k, ...) con los mismos parámetros.
+
+    Con numba el bucle sobre instancias se compila y corre en paralelo; sin
+    numba se ejecuta el mismo código en Python.
+
+    Salidas
+    -------
+    c, h : np.ndarray (n_instancias, num_periodos) float64
+        Costos de producción y de almacenamiento (columna j ↔ período j+1).
+    d : np.ndarray (n_instancias, num_periodos) int64
+        Demandas.
+    I0 : np.ndarray (n_instancias,) int64
+        Inventarios iniciales.
+    ============================================================================
+    """
+    semillas = seed + np.arange(n_instancias, dtype=np.int64)
+    return _lote(semillas, num_periodos, *_parametros(
+        rango_c_barato, rango_c_medio, rango_c_caro,
+        rango_h_barato, rango_h_medio, rango_h_caro,
+        demanda_base, demanda_ruido, prob_mes_caro, prob_mes_barato,
+        start_inventory_max, ensure_windows))
 
-    return df
 
 # ============================================================================
 # Gráficar Resultados
@@ -238,6 +422,16 @@ def generar_datos(num_periodos: int = 12,
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+def _valores(x, M):
+    """
+    Valores de `x` en los períodos M como arreglo. `x` puede ser un dict
+    indexado por t (una sola lectura por período) o un arreglo alineado con M.
+    """
+    if isinstance(x, dict):
+        return np.asarray(list(map(x.__getitem__, M)))
+    return np.asarray(x)
+
+
 def plot_plan_produccion(M, d, produccion, inventario_ini,
                          cost_produccion, cost_inventario, obj_lp):
     """
@@ -248,22 +442,25 @@ def plot_plan_produccion(M, d, produccion, inventario_ini,
       - Donut con composición del FO
       - Total centrado en el donut
       - Leyenda arriba
+
+    d, produccion e inventario_ini pueden ser dicts {t: valor} o arreglos
+    (p.ej. los de generar_datos(as_arrays=True)) en el orden de M.
     """
 
     # Etiquetas de períodos
     if len(M) <= 12:
-        meses = ['ENE','FEB','MAR','ABR','MAY','JUN','JUL','AGO','SEP','OCT','NOV','DIC'][:len(M)]
+        meses = _MESES_12[:len(M)]
     else:
-        meses = [f"M{i}" for i in M]
+        meses = np.char.add('M', np.asarray(M).astype(str))
 
-    # Datos
-    demanda_list    = [d[t] for t in M]
-    produccion_list = [produccion[t] for t in M]
-    inventario_list = [inventario_ini[t] for t in M]
+    # Datos (dicts indexados por t o arreglos ya alineados con M)
+    demanda_list    = _valores(d, M)
+    produccion_list = _valores(produccion, M)
+    inventario_list = _valores(inventario_ini, M)
 
     # Etiquetas: solo valores > 0
-    text_inventario = [str(v) if v != 0 else "" for v in inventario_list]
-    text_produccion = [str(v) if v != 0 else "" for v in produccion_list]
+    text_inventario = np.where(inventario_list != 0, inventario_list.astype(str), "")
+    text_produccion = np.where(produccion_list != 0, produccion_list.astype(str), "")
 
     # Subplots: 1 fila, 2 columnas
     fig = make_subplots(
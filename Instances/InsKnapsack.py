@@ -1,5 +1,5 @@
+import numpy as np
 import pandas as pd
-import random
 
 # ============================================================================
 # Coordenadas geográficas aproximadas por ciudad
@@ -36,33 +36,33 @@ def generar_datos(num_registros: int):
         '# de empleos generados (en miles)' -> empleos potenciales
         'Latitud' y 'Longitud' -> ubicación aleatoria dentro de la ciudad
     """
-    datos = []
-
-    for i in range(num_registros):
-        # 1. Seleccionar ciudad aleatoria
-        ciudad = random.choice(list(ciudades.keys()))
-        lat_range = ciudades[ciudad]["lat"]
-        lon_range = ciudades[ciudad]["lon"]
-
-        # 2. Atributos económicos
-        costo = round(random.uniform(1, 10), 0)    # costo entre 1 y 10 M COP
-        empleo = round(random.uniform(1, 15), 0)   # empleos entre 1 y 15 mil
-
-        # 3. Ubicación aleatoria dentro de los límites de la ciudad
-        lat = round(random.uniform(*lat_range), 6)
-        lon = round(random.uniform(*lon_range), 6)
-
-        # 4. Agregar registro
-        datos.append({
-            "Obra": f"Obra_{i}",
-            "Ciudad": ciudad,
-            "Costo de ejecución (en millones de pesos)": costo,
-            "# de empleos generados (en miles)": empleo,
-            "Latitud": lat,
-            "Longitud": lon
-        })
-
-    return pd.DataFrame(datos)
+    N = num_registros
+
+    # 1. Ciudad de cada obra y límites geográficos asociados
+    nombres = np.array(list(ciudades.keys()))
+    lat_lo  = np.array([ciudades[k]["lat"][0] for k in nombres])
+    lat_hi  = np.array([ciudades[k]["lat"][1] for k in nombres])
+    lon_lo  = np.array([ciudades[k]["lon"][0] for k in nombres])
+    lon_hi  = np.array([ciudades[k]["lon"][1] for k in nombres])
+    city_idx = np.random.randint(0, len(nombres), N)
+
+    # 2. Atributos económicos
+    costo  = np.round(np.random.uniform(1, 10, N))    # costo entre 1 y 10 M COP
+    empleo = np.round(np.random.uniform(1, 15, N))    # empleos entre 1 y 15 mil
+
+    # 3. Ubicación aleatoria dentro de los límites de la ciudad
+    lat = np.round(np.random.uniform(lat_lo[city_idx], lat_hi[city_idx]), 6)
+    lon = np.round(np.random.uniform(lon_lo[city_idx], lon_hi[city_idx]), 6)
+
+    # 4. Construir el DataFrame columna a columna
+    return pd.DataFrame({
+        "Obra": np.char.add("Obra_", np.arange(N).astype(str)).astype(object),
+        "Ciudad": nombres[city_idx].astype(object),
+        "Costo de ejecución (en millones de pesos)": costo,
+        "# de empleos generados (en miles)": empleo,
+        "Latitud": lat,
+        "Longitud": lon
+    })
 
 
 # ============================================================================
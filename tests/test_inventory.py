@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "DP", "Env"))
+
+from Inventory import InventoryEnv
+
+
+def _costo_optimo(env):
+    _, V = env.solve_dp()
+    return -V[(0, env.start_inventory)]
+
+
+@pytest.mark.parametrize("demanda, c, h, capacidad, S0", [
+    ([2, 5], [1, 100], [.1, .1], 10, 1),                         # 0 < S0 < d_0
+    ([3, 2, 1, 1, 0], [1.15, 8.32, 9.21, 6.46, 7.57],
+     [1.09, 1.87, 1.63, 0.01, 1.71], 12, 3),                     # S0 = d_0
+    ([2, 4, 1, 4], [2.8, 9.48, 4.29, 1.95], [1.26, 1.85, 0.88, 1.91], 20, 4),
+])
+def test_wagner_whitin_con_inventario_inicial(demanda, c, h, capacidad, S0):
+    completo = InventoryEnv(demanda, c, h, capacidad, start_inventory=S0)
+    podado   = InventoryEnv(demanda, c, h, capacidad, start_inventory=S0,
+                            assume_wagner_whitin=True)
+    assert _costo_optimo(podado) == pytest.approx(_costo_optimo(completo))
+
+
+def test_wagner_whitin_instancias_aleatorias():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n  = int(rng.integers(1, 7))
+        d  = rng.integers(0, 5, n).tolist()
+        c  = rng.uniform(1, 10, n).round(2).tolist()
+        h  = rng.uniform(0, 2, n).round(2).tolist()
+        S0 = int(rng.integers(0, 6))
+        capacidad = sum(d) + S0 + 2                              # no restrictiva
+        completo = InventoryEnv(d, c, h, capacidad, start_inventory=S0)
+        podado   = InventoryEnv(d, c, h, capacidad, start_inventory=S0,
+                                assume_wagner_whitin=True)
+        assert _costo_optimo(podado) == pytest.approx(_costo_optimo(completo))